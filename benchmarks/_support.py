@@ -0,0 +1,111 @@
+"""Utilidades compartidas por los benchmarks: servicios simulados y métricas."""
+
+import importlib.util
+import multiprocessing
+import os
+import secrets
+import socket
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import uvicorn
+from fastapi import FastAPI
+from sqlalchemy import text
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# El gateway exige una clave de sesión propia; los procesos hijos la heredan
+os.environ.setdefault("SESSION_SECRET", f"benchmark-{secrets.token_hex(16)}")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def stub_app() -> FastAPI:
+    stub = FastAPI()
+
+    @stub.get("/equipment")
+    def equipment():
+        return [{"id": str(i), "asset_tag": f"EQ-{i:04d}", "status": "operational"} for i in range(20)]
+
+    @stub.get("/equipment/{equipment_id}")
+    def equipment_detail(equipment_id: str):
+        return {"id": equipment_id, "asset_tag": f"EQ-{equipment_id}", "status": "operational"}
+
+    return stub
+
+
+def _serve(factory, port: int) -> None:
+    uvicorn.run(factory(), host="127.0.0.1", port=port, log_level="warning")
+
+
+def start_server(factory=stub_app) -> str:
+    """Sirve la app de ``factory`` en un proceso aparte y devuelve su URL base."""
+    port = free_port()
+    process = multiprocessing.Process(target=_serve, args=(factory, port), daemon=True)
+    process.start()
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def load_gateway(stub_url: str):
+    """Importa el gateway apuntando todos los microservicios a ``stub_url``."""
+    for name in ("EQUIPMENT", "PROVIDER", "MAINTENANCE", "REPORT"):
+        os.environ[f"{name}_SERVICE_URL"] = stub_url
+    database = Path(tempfile.mkdtemp()) / "gateway.db"
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{database}")
+    sys.path.insert(0, str(ROOT / "api_gateway"))
+    from app import main
+
+    return main
+
+
+def load_service(name: str):
+    """Importa ``services/<name>_service/app/main.py`` con el ``DATABASE_URL`` actual."""
+    sys.path.insert(0, str(ROOT))
+    path = ROOT / "services" / f"{name}_service" / "app" / "main.py"
+    spec = importlib.util.spec_from_file_location(f"{name}_service.app.main", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def prepare_users(engine) -> None:
+    """Crea la tabla ``users`` (SQLite) con el usuario ``admin``/``admin123``."""
+    with engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS users (
+                id TEXT PRIMARY KEY, username TEXT UNIQUE, password_hash TEXT,
+                full_name TEXT, role TEXT, email TEXT, is_active BOOLEAN
+            )
+        """))
+        conn.execute(text("""
+            INSERT OR IGNORE INTO users VALUES
+            ('1', 'admin', 'admin123', 'Administrador', 'admin', 'admin@example.org', 1)
+        """))
+
+
+def auth_headers(gateway, role: str = "admin") -> dict:
+    user = SimpleNamespace(id="bench", username="bench", role=role)
+    token, _ = gateway.issue_token(user)
+    return {"Authorization": f"Bearer {token}"}
+
+
+def report(label: str, latencies: list) -> None:
+    ordered = sorted(latencies)
+    p50 = statistics.median(ordered)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"{label:<28} p50={p50:7.2f} ms  p99={p99:7.2f} ms  n={len(ordered)}")
@@ -0,0 +1,94 @@
+"""Altas concurrentes de equipos: carrera por ``asset_tag`` y rendimiento.
+
+Requiere PostgreSQL con ``db/schema.sql`` aplicado. Llama directamente a
+``create_equipment`` del servicio desde varios hilos, cada uno con su sesión,
+y lo compara con la versión anterior (``SELECT`` previo, ``INSERT``, ``COMMIT``
+y ``REFRESH``):
+
+1. carrera: ``--threads`` altas simultáneas con el mismo ``asset_tag``; debe
+   haber exactamente un alta y el resto 409, nunca un error de integridad;
+2. rendimiento: altas por segundo con ``asset_tag`` distintos.
+
+Uso:
+    python benchmarks/create_concurrency.py --database-url postgresql+psycopg2://... --threads 10
+"""
+
+import argparse
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from _support import load_service
+
+
+def _legacy_create(models, payload, db):
+    exists = db.query(models.Equipment).filter(models.Equipment.asset_tag == payload.asset_tag).first()
+    if exists:
+        raise _Conflict()
+    equipment = models.Equipment(**payload.dict())
+    db.add(equipment)
+    db.commit()
+    db.refresh(equipment)
+    return equipment
+
+
+class _Conflict(Exception):
+    pass
+
+
+def _outcome(create, payload, session_factory, barrier=None) -> str:
+    from fastapi import HTTPException
+    from sqlalchemy.exc import IntegrityError
+
+    with session_factory() as db:
+        if barrier:
+            barrier.wait()
+        try:
+            create(payload, db)
+            return "201"
+        except (_Conflict, HTTPException):
+            return "409"
+        except IntegrityError:
+            return "500 (IntegrityError)"
+
+
+def main(args) -> None:
+    os.environ["DATABASE_URL"] = args.database_url
+    service = load_service("equipment")
+    from common import models, schemas
+    from common.database import SessionLocal
+
+    implementations = {
+        "anterior": lambda payload, db: _legacy_create(models, payload, db),
+        "INSERT ... ON CONFLICT": service.create_equipment,
+    }
+    for label, create in implementations.items():
+        tag = f"RACE-{uuid.uuid4().hex[:10]}"
+        barrier = threading.Barrier(args.threads)
+        payload = schemas.EquipmentCreate(asset_tag=tag)
+        with ThreadPoolExecutor(args.threads) as pool:
+            outcomes = Counter(pool.map(
+                lambda _: _outcome(create, payload, SessionLocal, barrier), range(args.threads)
+            ))
+        print(f"{label:<24} carrera con {args.threads} hilos: {dict(outcomes)}")
+
+        prefix = uuid.uuid4().hex[:8]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.threads) as pool:
+            results = Counter(pool.map(
+                lambda index: _outcome(create, schemas.EquipmentCreate(asset_tag=f"TP-{prefix}-{index}"), SessionLocal),
+                range(args.creates),
+            ))
+        elapsed = time.perf_counter() - start
+        print(f"{label:<24} {args.creates / elapsed:8.0f} altas/s  {dict(results)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--threads", type=int, default=10, help="no más que el pool de conexiones (5 + 10)")
+    parser.add_argument("--creates", type=int, default=5000)
+    main(parser.parse_args())
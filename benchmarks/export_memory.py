@@ -0,0 +1,146 @@
+"""Memoria del microservicio de equipos durante ``GET /equipment/export``.
+
+Llena ``equipment`` con ``--assets`` filas, levanta el servicio con uvicorn en
+un proceso aparte y descarga la exportación en streaming, muestreando el RSS
+del proceso cada ``--every`` filas recibidas. Como referencia mide en otro
+proceso el pico de memoria de la carga anterior (todas las filas como objetos
+ORM y la respuesta JSON completa).
+
+Por defecto usa una base SQLite temporal; con ``--database-url`` apunta a
+PostgreSQL (debe existir el esquema).
+
+Uso:
+    python benchmarks/export_memory.py --assets 1000000 --format ndjson
+"""
+
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from _support import ROOT, free_port
+
+
+SEED_SQLITE = """
+    WITH RECURSIVE g(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM g WHERE n < :assets)
+    INSERT INTO equipment (id, asset_tag, name, model, serial_number, location, status, cost,
+                           purchase_date, useful_life_years, created_at, updated_at)
+    SELECT lower(hex(randomblob(16))), 'EXP-' || printf('%07d', n), 'Laptop ' || (n % 50),
+           'M-' || (n % 997), hex(randomblob(8)), 'Bloque ' || (n % 40), 'operational', 850.00,
+           date('2018-01-01', '+' || (n % 2000) || ' days'), 5,
+           datetime('2020-01-01', '+' || n || ' seconds'), datetime('2020-01-01', '+' || n || ' seconds')
+    FROM g
+"""
+
+SEED_POSTGRES = """
+    INSERT INTO equipment (asset_tag, name, model, serial_number, location, status, cost, purchase_date)
+    SELECT 'EXP-' || lpad(g::text, 7, '0'), 'Laptop ' || (g % 50), 'M-' || (g % 997), md5(g::text),
+           'Bloque ' || (g % 40), 'operational', 850.00, DATE '2018-01-01' + (g % 2000)
+    FROM generate_series(1, :assets) AS g
+    ON CONFLICT (asset_tag) DO NOTHING
+"""
+
+
+def _rss_mb(pid: int, field: str = "VmRSS") -> float:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith(f"{field}:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _seed(database_url: str, assets: int) -> None:
+    sys.path.insert(0, str(ROOT))
+    os.environ["DATABASE_URL"] = database_url
+    from sqlalchemy import text
+
+    from common import models
+    from common.database import Base, engine
+
+    sqlite = database_url.startswith("sqlite")
+    if sqlite:
+        Base.metadata.create_all(engine, tables=[models.Supplier.__table__, models.Equipment.__table__])
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text(SEED_SQLITE if sqlite else SEED_POSTGRES), {"assets": assets})
+    print(f"{assets} equipos preparados en {time.perf_counter() - started:.1f} s")
+
+
+def _legacy_peak(database_url: str, queue) -> None:
+    sys.path.insert(0, str(ROOT))
+    os.environ["DATABASE_URL"] = database_url
+    from fastapi.encoders import jsonable_encoder
+
+    from common import models, schemas
+    from common.database import SessionLocal
+
+    with SessionLocal() as db:
+        items = [schemas.EquipmentOut.from_orm(item) for item in db.query(models.Equipment).all()]
+        body = jsonable_encoder(items)
+    queue.put((len(body), _rss_mb(os.getpid(), "VmHWM")))
+
+
+def main(args) -> None:
+    database_url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'export.db'}"
+    _seed(database_url, args.assets)
+
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT / "services" / "equipment_service",
+        env={**os.environ, "PYTHONPATH": str(ROOT), "DATABASE_URL": database_url, "COUNTERS_RECONCILE_INTERVAL": "0"},
+    )
+    try:
+        url = f"http://127.0.0.1:{port}"
+        deadline = time.time() + 60
+        while True:
+            try:
+                httpx.get(f"{url}/docs", timeout=1)
+                break
+            except httpx.HTTPError:
+                if time.time() > deadline:
+                    raise RuntimeError("el servicio no respondió a tiempo")
+                time.sleep(0.2)
+
+        print(f"RSS en reposo: {_rss_mb(process.pid):7.1f} MB")
+        rows, size = -1 if args.format == "csv" else 0, 0
+        started = time.perf_counter()
+        with httpx.stream("GET", f"{url}/equipment/export", params={"format": args.format}, timeout=None) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                rows += 1
+                size += len(line) + 1
+                if rows and rows % args.every == 0:
+                    print(f"{rows:>9} filas  RSS={_rss_mb(process.pid):7.1f} MB")
+        elapsed = time.perf_counter() - started
+        print(
+            f"exportación: {rows} filas, {size / 2**20:.1f} MiB en {elapsed:.1f} s "
+            f"({rows / elapsed:,.0f} filas/s); pico RSS={_rss_mb(process.pid, 'VmHWM'):7.1f} MB"
+        )
+    finally:
+        process.terminate()
+        process.wait()
+
+    if args.legacy:
+        queue = multiprocessing.Queue()
+        worker = multiprocessing.Process(target=_legacy_peak, args=(database_url, queue))
+        worker.start()
+        loaded, peak = queue.get()
+        worker.join()
+        print(f"carga ORM completa (anterior): {loaded} filas, pico RSS={peak:7.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assets", type=int, default=1000000)
+    parser.add_argument("--format", choices=("ndjson", "csv"), default="ndjson")
+    parser.add_argument("--every", type=int, default=100000, help="filas entre muestras de RSS")
+    parser.add_argument("--database-url", help="por defecto, SQLite temporal")
+    parser.add_argument("--no-legacy", dest="legacy", action="store_false", help="omite la carga completa anterior")
+    main(parser.parse_args())
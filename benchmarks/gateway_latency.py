@@ -0,0 +1,74 @@
+"""Latencia p50/p99 del gateway contra microservicios simulados.
+
+Compara el comportamiento anterior (un ``httpx.AsyncClient`` nuevo por
+petición) con los clientes compartidos con keep-alive. Cada petición consulta
+un equipo distinto para que ni la caché ni la agrupación del gateway
+intervengan en la medición.
+
+Uso:
+    python benchmarks/gateway_latency.py --requests 2000 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from _support import auth_headers, load_gateway, report, start_server
+
+
+def _legacy_request(main):
+    async def _request(method: str, url: str, **kwargs) -> httpx.Response:
+        async with httpx.AsyncClient(timeout=15.0) as client:
+            try:
+                response = await client.request(method, url, **kwargs)
+                response.raise_for_status()
+                return response
+            except httpx.HTTPStatusError as exc:
+                raise main.HTTPException(status_code=exc.response.status_code, detail=exc.response.json()) from exc
+            except httpx.RequestError as exc:
+                raise main.HTTPException(status_code=503, detail=str(exc)) from exc
+
+    return _request
+
+
+async def _measure(gateway, total: int, concurrency: int) -> list:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=gateway.app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://gateway", headers=auth_headers(gateway)
+    ) as client:
+
+        async def one(index: int):
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(f"/equipment/{index}")
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        await asyncio.gather(*(one(index) for index in range(total)))
+    return latencies
+
+
+async def main_async(args) -> None:
+    gateway = load_gateway(start_server())
+    pooled_request = gateway._request
+
+    gateway._request = _legacy_request(gateway)
+    report("cliente por petición", await _measure(gateway, args.requests, args.concurrency))
+
+    gateway._request = pooled_request
+    await gateway.open_clients()
+    try:
+        report("clientes compartidos", await _measure(gateway, args.requests, args.concurrency))
+    finally:
+        await gateway.close_clients()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    asyncio.run(main_async(parser.parse_args()))
@@ -0,0 +1,113 @@
+"""Latencia de ``GET /equipment/{id}/history`` a medida que crece el historial.
+
+Llena ``equipment_movements`` por etapas (``--sizes``) repartiendo los
+movimientos entre muchos equipos, con el índice
+``(equipment_id, moved_at DESC, id DESC)`` de ``db/schema.sql``, y mide en cada
+etapa los últimos N, la primera página y una página a mitad del historial (por
+cursor) frente a la carga completa anterior de ``equipment.movements``.
+
+Por defecto usa una base SQLite temporal; con ``--database-url`` apunta a
+PostgreSQL (debe existir el esquema).
+
+Uso:
+    python benchmarks/history_scaling.py --sizes 10000,100000,1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from _support import load_service, report
+
+
+TARGET_SHARE = 10  # uno de cada TARGET_SHARE movimientos es del equipo medido
+INSERT_BATCH = 20000
+
+
+def _timed(call, repetitions: int) -> list:
+    latencies = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def _grow(engine, models, target, others, start: int, stop: int, origin: datetime) -> None:
+    table = models.EquipmentMovement.__table__
+    with engine.begin() as conn:
+        for offset in range(start, stop, INSERT_BATCH):
+            rows = []
+            for index in range(offset, min(stop, offset + INSERT_BATCH)):
+                owner = target if index % TARGET_SHARE == 0 else others[index % len(others)]
+                rows.append({
+                    "id": uuid.uuid4(),
+                    "equipment_id": owner,
+                    "from_location": "A",
+                    "to_location": "B",
+                    "moved_at": origin + timedelta(seconds=index),
+                })
+            conn.execute(table.insert(), rows)
+
+
+def main(args) -> None:
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(tempfile.mkdtemp()) / 'history.db'}"
+    service = load_service("equipment")
+    from fastapi.testclient import TestClient
+    from sqlalchemy import text
+
+    from common import models
+    from common.database import Base, SessionLocal, engine
+
+    if not args.database_url:
+        Base.metadata.create_all(engine, tables=[models.Supplier.__table__, models.Equipment.__table__,
+                                                 models.EquipmentMovement.__table__])
+        with engine.begin() as conn:
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS idx_equipment_movements_equipment_moved "
+                "ON equipment_movements(equipment_id, moved_at DESC, id DESC)"
+            ))
+
+    with engine.begin() as conn:
+        equipment = [{"id": uuid.uuid4(), "asset_tag": f"HIST-{uuid.uuid4().hex[:12]}"} for _ in range(args.assets)]
+        conn.execute(models.Equipment.__table__.insert(), equipment)
+    target, others = equipment[0]["id"], [row["id"] for row in equipment[1:]]
+
+    client = TestClient(service.app)
+    url = f"/equipment/{target}/history"
+    origin = datetime(2020, 1, 1)
+    grown = 0
+    for size in (int(value) for value in args.sizes.split(",")):
+        _grow(engine, models, target, others, grown, size, origin)
+        grown = size
+        middle = origin + timedelta(seconds=size // 2)
+        print(f"--- {size} movimientos ({size // TARGET_SHARE} del equipo medido)")
+        report("latest=20", _timed(lambda: client.get(url, params={"latest": 20}).raise_for_status(), args.requests))
+        report("primera página (50)", _timed(lambda: client.get(url).raise_for_status(), args.requests))
+        report("página a mitad (until)", _timed(
+            lambda: client.get(url, params={"until": middle.isoformat()}).raise_for_status(), args.requests
+        ))
+        if args.legacy:
+
+            def legacy():
+                with SessionLocal() as db:
+                    len(db.get(models.Equipment, target).movements)
+
+            report("carga completa (anterior)", _timed(legacy, max(1, args.requests // 20)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--assets", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--database-url", help="por defecto, SQLite temporal")
+    parser.add_argument("--no-legacy", dest="legacy", action="store_false", help="omite la carga completa anterior")
+    main(parser.parse_args())
@@ -0,0 +1,81 @@
+"""Latencia de peticiones proxificadas durante una ráfaga de logins.
+
+Compara la consulta de usuario ejecutada dentro del event loop (comportamiento
+anterior) con la consulta en el grupo de hilos acotado. La latencia de la BD se
+simula con ``--db-latency`` sobre una base SQLite temporal.
+
+Uso:
+    python benchmarks/login_burst.py --logins 200 --requests 300
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from _support import auth_headers, load_gateway, prepare_users, report, start_server
+
+
+async def _run(gateway, logins: int, requests: int, interval: float) -> list:
+    latencies = []
+    transport = httpx.ASGITransport(app=gateway.app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://gateway", headers=auth_headers(gateway)
+    ) as client:
+
+        async def login():
+            response = await client.post("/auth/login", json={"username": "admin", "password": "admin123"})
+            response.raise_for_status()
+
+        origin = time.perf_counter()
+
+        async def proxied(index: int):
+            # La latencia se mide desde el instante programado, no desde que el
+            # event loop logra despertar la corrutina, para no ocultar bloqueos.
+            scheduled = origin + index * interval / 1000
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            response = await client.get(f"/equipment/{index}")
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - scheduled) * 1000)
+
+        await asyncio.gather(
+            *(login() for _ in range(logins)),
+            *(proxied(index) for index in range(requests)),
+        )
+    return latencies
+
+
+async def main_async(args) -> None:
+    gateway = load_gateway(start_server())
+    prepare_users(gateway.db_engine)
+    find_user = gateway._find_user
+
+    def slow_find_user(username: str):
+        time.sleep(args.db_latency / 1000)
+        return find_user(username)
+
+    gateway._find_user = slow_find_user
+    threaded_lookup = gateway._lookup_user
+
+    async def blocking_lookup(username: str):
+        return gateway._find_user(username)
+
+    await gateway.open_clients()
+    try:
+        report("sin logins", await _run(gateway, 0, args.requests, args.interval))
+        gateway._lookup_user = blocking_lookup
+        report("logins en el event loop", await _run(gateway, args.logins, args.requests, args.interval))
+        gateway._lookup_user = threaded_lookup
+        report("logins en hilos acotados", await _run(gateway, args.logins, args.requests, args.interval))
+    finally:
+        await gateway.close_clients()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--interval", type=float, default=10.0, help="milisegundos entre peticiones proxificadas")
+    parser.add_argument("--db-latency", type=float, default=5.0, help="milisegundos por consulta")
+    asyncio.run(main_async(parser.parse_args()))
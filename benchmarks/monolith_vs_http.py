@@ -0,0 +1,139 @@
+"""Latencia por petición y memoria: despliegue por procesos vs. modo monolito.
+
+Levanta con uvicorn los cuatro microservicios y el gateway como procesos
+separados (como en ``docker-compose.yml``) y luego el gateway solo con
+``GATEWAY_MODE=monolith``. Ambos usan la misma base SQLite temporal. Mide
+p50/p99 de ``GET /equipment/{id}`` y la suma del RSS de los procesos.
+
+Uso:
+    python benchmarks/monolith_vs_http.py --requests 500
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from sqlalchemy import create_engine
+
+from _support import ROOT, free_port, prepare_users, report
+
+
+SERVICES = ("equipment", "provider", "maintenance", "report")
+
+
+def _prepare_database(url: str) -> None:
+    sys.path.insert(0, str(ROOT))
+    os.environ["DATABASE_URL"] = url
+    from common import models
+    from common.database import Base
+
+    engine = create_engine(url)
+    Base.metadata.create_all(engine, tables=[model.__table__ for model in (
+        models.Supplier, models.SupplierContract, models.Equipment,
+        models.EquipmentMovement, models.MaintenanceTask, models.MaintenanceLog,
+    )])
+    prepare_users(engine)
+
+
+def _spawn(cwd: Path, port: int, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=cwd,
+        env={**os.environ, "PYTHONPATH": str(ROOT), **env},
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def _wait_ready(url: str) -> None:
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            httpx.get(f"{url}/health", timeout=1).raise_for_status()
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} no respondió a tiempo")
+
+
+def _wait_ready_service(url: str) -> None:
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            httpx.get(f"{url}/docs", timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} no respondió a tiempo")
+
+
+def _rss_mb(processes) -> float:
+    total_kb = 0
+    for process in processes:
+        with open(f"/proc/{process.pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    total_kb += int(line.split()[1])
+    return total_kb / 1024
+
+
+def _start_http(env: dict) -> tuple:
+    processes = []
+    gateway_env = dict(env)
+    for name in SERVICES:
+        port = free_port()
+        processes.append(_spawn(ROOT / "services" / f"{name}_service", port, env))
+        gateway_env[f"{name.upper()}_SERVICE_URL"] = f"http://127.0.0.1:{port}"
+    for name in SERVICES:
+        _wait_ready_service(gateway_env[f"{name.upper()}_SERVICE_URL"])
+    port = free_port()
+    processes.append(_spawn(ROOT / "api_gateway", port, gateway_env))
+    return processes, f"http://127.0.0.1:{port}"
+
+
+def _start_monolith(env: dict) -> tuple:
+    port = free_port()
+    process = _spawn(ROOT / "api_gateway", port, {**env, "GATEWAY_MODE": "monolith"})
+    return [process], f"http://127.0.0.1:{port}"
+
+
+def _measure(url: str, total: int) -> list:
+    with httpx.Client(base_url=url, timeout=30) as client:
+        token = client.post("/auth/login", json={"username": "admin", "password": "admin123"}).json()["token"]
+        client.headers["Authorization"] = f"Bearer {token}"
+        created = client.post("/equipment", json={"asset_tag": f"BENCH-{time.time_ns()}"})
+        created.raise_for_status()
+        equipment_id = created.json()["id"]
+        latencies = []
+        for _ in range(total):
+            start = time.perf_counter()
+            client.get(f"/equipment/{equipment_id}").raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main(args) -> None:
+    database_url = f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}"
+    _prepare_database(database_url)
+    env = {"DATABASE_URL": database_url}
+    for label, start in (("procesos separados", _start_http), ("monolito", _start_monolith)):
+        processes, url = start(env)
+        try:
+            _wait_ready(url)
+            report(label, _measure(url, args.requests))
+            print(f"{'':<28} RSS total={_rss_mb(processes):7.1f} MB  procesos={len(processes)}")
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    main(parser.parse_args())
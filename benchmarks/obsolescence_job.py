@@ -0,0 +1,111 @@
+"""Duración y transacción más larga del trabajo de obsolescencia.
+
+Llena ``equipment`` con ``--assets`` equipos (la mitad candidatos a obsoletos) y
+ejecuta el trabajo anterior (todas las filas como objetos ORM filtradas en
+Python, en una sola transacción) y el nuevo por bloques con ``UPDATE ...
+RETURNING``. Antes de cada variante se restauran los estados. Informa filas
+por segundo y la transacción más larga, que es el tiempo que se retienen los
+bloqueos.
+
+Por defecto usa una base SQLite temporal; con ``--database-url`` apunta a
+PostgreSQL (debe existir el esquema).
+
+Uso:
+    python benchmarks/obsolescence_job.py --assets 200000 --chunk-size 1000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from datetime import date
+from pathlib import Path
+
+from _support import load_service
+
+
+INSERT_BATCH = 20000
+
+
+def _legacy(session_scope, models, obsolete_years: int) -> None:
+    with session_scope() as session:
+        cutoff_year = date.today().year - obsolete_years
+        equipment = (
+            session.query(models.Equipment)
+            .filter(models.Equipment.purchase_date != None)  # noqa: E711
+            .all()
+        )
+        for item in equipment:
+            if item.purchase_date.year <= cutoff_year and item.status == "operational":
+                item.status = "obsolete"
+                session.add(item)
+
+
+def main(args) -> None:
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        os.environ["DATABASE_URL"] = f"sqlite:///{Path(tempfile.mkdtemp()) / 'obsolescence.db'}"
+    service = load_service("maintenance")
+    from sqlalchemy import event, update
+
+    from common import models
+    from common.database import Base, engine, session_scope
+
+    if not args.database_url:
+        Base.metadata.create_all(engine, tables=[
+            models.Supplier.__table__, models.Equipment.__table__, models.EquipmentStatusAudit.__table__,
+        ])
+
+    old, recent = date(2010, 1, 1), date.today()
+    with engine.begin() as conn:
+        table = models.Equipment.__table__
+        for offset in range(0, args.assets, INSERT_BATCH):
+            conn.execute(table.insert(), [
+                {
+                    "id": uuid.uuid4(),
+                    "asset_tag": f"OBS-{uuid.uuid4().hex[:16]}",
+                    "purchase_date": old if index % 2 else recent,
+                    "status": "operational",
+                }
+                for index in range(offset, min(args.assets, offset + INSERT_BATCH))
+            ])
+
+    transactions = []
+    opened = {}
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        opened[id(conn)] = time.perf_counter()
+
+    @event.listens_for(engine, "commit")
+    def _commit(conn):
+        transactions.append(time.perf_counter() - opened.pop(id(conn), time.perf_counter()))
+
+    def measure(label: str, job) -> None:
+        with engine.begin() as conn:
+            conn.execute(update(models.Equipment.__table__).values(status="operational"))
+        transactions.clear()
+        start = time.perf_counter()
+        job()
+        elapsed = time.perf_counter() - start
+        with session_scope() as session:
+            changed = session.query(models.Equipment).filter_by(status="obsolete").count()
+        print(
+            f"{label:<28} {changed} filas en {elapsed:6.2f} s  ({changed / elapsed:9,.0f} filas/s)  "
+            f"transacción más larga={max(transactions) * 1000:8.1f} ms  transacciones={len(transactions)}"
+        )
+
+    if args.legacy:
+        measure("ORM fila a fila (anterior)", lambda: _legacy(session_scope, models, service.OBSOLETE_YEARS))
+    measure(f"por bloques de {args.chunk_size}", lambda: service.run_obsolescence(chunk_size=args.chunk_size))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assets", type=int, default=200000)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--database-url", help="por defecto, SQLite temporal")
+    parser.add_argument("--no-legacy", dest="legacy", action="store_false", help="omite el trabajo anterior")
+    main(parser.parse_args())
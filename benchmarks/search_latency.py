@@ -0,0 +1,71 @@
+"""Latencia de ``GET /equipment/search`` sobre un inventario grande.
+
+Requiere PostgreSQL con ``db/schema.sql`` aplicado (``pg_trgm`` y los índices de
+búsqueda). Inserta ``--assets`` equipos sintéticos con ``generate_series`` en
+el propio servidor, ejecuta ``ANALYZE`` y mide p50/p99 de búsquedas por prefijo
+de asset tag, por palabras y con errores de escritura.
+
+Uso:
+    python benchmarks/search_latency.py --database-url postgresql+psycopg2://... --assets 1000000
+"""
+
+import argparse
+import os
+import time
+
+from _support import load_service, report
+
+
+SEED = """
+    INSERT INTO equipment (asset_tag, name, model, serial_number, location, status)
+    SELECT
+        'SRCH-' || lpad(g::text, 7, '0'),
+        (ARRAY['Laptop', 'Desktop', 'Monitor', 'Impresora', 'Proyector'])[1 + g % 5]
+            || ' ' || (ARRAY['Lenovo', 'Dell', 'HP', 'Epson', 'Acer'])[1 + (g / 5) % 5],
+        'M-' || (g % 997),
+        md5(g::text),
+        'Bloque ' || (g % 40),
+        (ARRAY['operational', 'maintenance', 'retired'])[1 + g % 3]
+    FROM generate_series(1, :assets) AS g
+    ON CONFLICT (asset_tag) DO NOTHING
+"""
+
+QUERIES = {
+    "prefijo de asset tag": {"q": "SRCH-00012"},
+    "palabras": {"q": "laptop lenovo"},
+    "error de escritura": {"q": "lenvo"},
+    "palabras + estado": {"q": "bloque 12", "status": "retired"},
+}
+
+
+def main(args) -> None:
+    os.environ["DATABASE_URL"] = args.database_url
+    service = load_service("equipment")
+    from fastapi.testclient import TestClient
+    from sqlalchemy import text
+
+    from common.database import engine
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text(SEED), {"assets": args.assets})
+        conn.execute(text("ANALYZE equipment"))
+    print(f"inventario preparado en {time.perf_counter() - started:.1f} s")
+
+    client = TestClient(service.app)
+    for label, params in QUERIES.items():
+        client.get("/equipment/search", params=params).raise_for_status()
+        latencies = []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            client.get("/equipment/search", params=params).raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+        report(label, latencies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--assets", type=int, default=1_000_000)
+    parser.add_argument("--requests", type=int, default=100)
+    main(parser.parse_args())
@@ -0,0 +1,138 @@
+"""Latencia de la API de mantenimiento mientras corre el trabajo de obsolescencia.
+
+Levanta el servicio de mantenimiento con uvicorn (``RUN_SCHEDULER=false``) y
+mide p50/p99 de ``GET /tasks`` en reposo, mientras el trabajo se ejecuta dentro
+del proceso de la API (como hacía el scheduler embebido, aquí mediante
+``POST /obsolescence/run``) y mientras se ejecuta en un proceso aparte, como en
+el worker (``python -m app.worker``). Antes de cada variante se restauran los
+estados de los equipos.
+
+Por defecto usa una base SQLite temporal; con ``--database-url`` apunta a
+PostgreSQL (debe existir el esquema).
+
+Uso:
+    python benchmarks/worker_isolation.py --assets 200000
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import date
+from pathlib import Path
+
+import httpx
+
+from _support import ROOT, free_port, report
+
+
+SERVICE_DIR = ROOT / "services" / "maintenance_service"
+INSERT_BATCH = 20000
+
+
+def _prepare(database_url: str, assets: int, tasks: int):
+    sys.path.insert(0, str(ROOT))
+    os.environ["DATABASE_URL"] = database_url
+    from common import models
+    from common.database import Base, engine
+
+    if database_url.startswith("sqlite"):
+        Base.metadata.create_all(engine, tables=[
+            models.Supplier.__table__, models.Equipment.__table__, models.EquipmentStatusAudit.__table__,
+            models.MaintenanceTask.__table__, models.MaintenanceLog.__table__, models.JobRun.__table__,
+        ])
+    with engine.begin() as conn:
+        ids = []
+        for offset in range(0, assets, INSERT_BATCH):
+            rows = [
+                {"id": uuid.uuid4(), "asset_tag": f"ISO-{uuid.uuid4().hex[:16]}", "purchase_date": date(2010, 1, 1)}
+                for _ in range(offset, min(assets, offset + INSERT_BATCH))
+            ]
+            conn.execute(models.Equipment.__table__.insert(), rows)
+            ids.extend(row["id"] for row in rows[:tasks - len(ids)])
+        conn.execute(models.MaintenanceTask.__table__.insert(), [
+            {"id": uuid.uuid4(), "equipment_id": equipment_id, "scheduled_for": date.today(),
+             "type": "preventive", "priority": "low", "status": "scheduled"}
+            for equipment_id in ids
+        ])
+    return engine, models
+
+
+def _reset(engine, models) -> None:
+    from sqlalchemy import update
+
+    with engine.begin() as conn:
+        conn.execute(update(models.Equipment.__table__).values(status="operational"))
+
+
+def _measure_while(client: httpx.Client, job) -> list:
+    """Latencias de ``GET /tasks`` mientras ``job`` corre en otro hilo (o sin trabajo)."""
+    latencies = []
+    done = threading.Event()
+
+    def background():
+        job()
+        done.set()
+
+    if job:
+        threading.Thread(target=background, daemon=True).start()
+    else:
+        threading.Timer(5, done.set).start()
+    while not done.is_set():
+        start = time.perf_counter()
+        client.get("/tasks", params={"limit": 200}).raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.01)
+    return latencies
+
+
+def main(args) -> None:
+    database_url = args.database_url or f"sqlite:///{Path(tempfile.mkdtemp()) / 'worker.db'}"
+    engine, models = _prepare(database_url, args.assets, args.tasks)
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "DATABASE_URL": database_url, "RUN_SCHEDULER": "false"}
+    port = free_port()
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVICE_DIR,
+        env=env,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=600) as client:
+            deadline = time.time() + 60
+            while True:
+                try:
+                    client.get("/tasks", params={"limit": 200}).raise_for_status()
+                    break
+                except httpx.HTTPError:
+                    if time.time() > deadline:
+                        raise RuntimeError("el servicio no respondió a tiempo")
+                    time.sleep(0.2)
+
+            report("en reposo", _measure_while(client, None))
+
+            _reset(engine, models)
+            report("trabajo en el proceso API", _measure_while(
+                client, lambda: client.post("/obsolescence/run").raise_for_status()
+            ))
+
+            _reset(engine, models)
+            report("trabajo en el worker", _measure_while(client, lambda: subprocess.run(
+                [sys.executable, "-c", "from app.main import run_obsolescence; run_obsolescence()"],
+                cwd=SERVICE_DIR, env=env, check=True, stderr=subprocess.DEVNULL,
+            )))
+    finally:
+        api.terminate()
+        api.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assets", type=int, default=200000)
+    parser.add_argument("--tasks", type=int, default=200, help="tareas devueltas por GET /tasks")
+    parser.add_argument("--database-url", help="por defecto, SQLite temporal")
+    main(parser.parse_args())
@@ -1,13 +1,17 @@
 """Paquete compartido entre microservicios."""
 
-from .database import Base, get_session, SessionLocal, session_scope
-from . import models, schemas, utils
+from .database import Base, get_read_session, get_session, prefers_primary, read_session_scope, SessionLocal, session_scope
+from . import jobs, models, schemas, utils
 
 __all__ = [
     "Base",
+    "get_read_session",
     "get_session",
+    "prefers_primary",
+    "read_session_scope",
     "SessionLocal",
     "session_scope",
+    "jobs",
     "models",
     "schemas",
     "utils",
@@ -0,0 +1,163 @@
+"""Trabajos programados coordinados entre réplicas.
+
+Cada trabajo tiene un horario que, dado un instante, devuelve la última hora
+programada hasta ese momento. Todas las réplicas revisan sus trabajos
+periódicamente con ``run_due``; la que logra registrar la fila
+``(job_id, scheduled_for)`` en ``job_runs`` lo ejecuta y las demás lo omiten.
+
+- Si el proceso muere a mitad de una ejecución, la fila sigue ``running`` hasta
+  que vence su arrendamiento y otra réplica la retoma.
+- Una ejecución fallida se reintenta tras ``JOB_RETRY_DELAY`` segundos, hasta
+  ``JOB_MAX_ATTEMPTS`` intentos.
+- Un horario perdido mientras el servicio estaba detenido se ejecuta en la
+  siguiente revisión; si se perdieron varios, se ejecuta sólo el más reciente.
+"""
+
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+from uuid import UUID, uuid4
+
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert
+
+from . import models
+from .database import session_scope
+
+
+logger = logging.getLogger("common.jobs")
+
+# Identifica la réplica en job_runs.owner
+INSTANCE_ID = os.getenv("INSTANCE_ID") or f"{socket.gethostname()}:{os.getpid()}"
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_DELAY = int(os.getenv("JOB_RETRY_DELAY", "300"))
+
+Schedule = Callable[[datetime], datetime]
+
+
+def every(hours: float) -> Schedule:
+    """Horario cada ``hours`` horas, alineado a medianoche UTC."""
+    period = timedelta(hours=hours)
+
+    def latest(now: datetime) -> datetime:
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return midnight + (now - midnight) // period * period
+
+    return latest
+
+
+def daily_at(hour: int, minute: int = 0) -> Schedule:
+    """Horario diario a la hora UTC indicada."""
+
+    def latest(now: datetime) -> datetime:
+        slot = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        return slot if slot <= now else slot - timedelta(days=1)
+
+    return latest
+
+
+class Job:
+    """Trabajo programado: ``func`` devuelve el número de filas procesadas.
+
+    ``lease_seconds`` debe superar la duración esperada de una ejecución; al
+    vencer, otra réplica puede dar la ejecución por perdida y repetirla.
+    """
+
+    def __init__(self, job_id: str, func: Callable[[], int], schedule: Schedule, lease_seconds: int = 3600):
+        self.job_id = job_id
+        self.func = func
+        self.schedule = schedule
+        self.lease_seconds = lease_seconds
+
+
+def claim(job: Job, scheduled_for: datetime, now: datetime) -> Optional[UUID]:
+    """Reserva el horario para esta réplica; ``None`` si ya lo tiene o lo hizo otra."""
+    run = models.JobRun
+    statement = insert(run).values(
+        id=uuid4(),
+        job_id=job.job_id,
+        scheduled_for=scheduled_for,
+        owner=INSTANCE_ID,
+        status="running",
+        attempt=1,
+        started_at=now,
+        lease_expires_at=now + timedelta(seconds=job.lease_seconds),
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=[run.job_id, run.scheduled_for],
+        set_={
+            "owner": statement.excluded.owner,
+            "status": "running",
+            "attempt": run.attempt + 1,
+            "error": None,
+            "started_at": statement.excluded.started_at,
+            "finished_at": None,
+            "lease_expires_at": statement.excluded.lease_expires_at,
+        },
+        where=(run.status != "succeeded") & (run.lease_expires_at < now) & (run.attempt < JOB_MAX_ATTEMPTS),
+    ).returning(run.id)
+    with session_scope() as session:
+        return session.scalar(statement)
+
+
+def _finish(run_id: UUID, started: float, rows: Optional[int] = None, error: Optional[str] = None) -> None:
+    now = datetime.utcnow()
+    values = {
+        "status": "failed" if error else "succeeded",
+        "rows": rows,
+        "error": error,
+        "finished_at": now,
+        "duration_seconds": round(time.perf_counter() - started, 3),
+    }
+    if error:
+        values["lease_expires_at"] = now + timedelta(seconds=JOB_RETRY_DELAY)
+    with session_scope() as session:
+        session.execute(update(models.JobRun).where(models.JobRun.id == run_id).values(**values))
+
+
+def run_due(jobs: List[Job], now: Optional[datetime] = None) -> List[Dict]:
+    """Ejecuta los trabajos cuyo último horario nadie completó ni tiene reservado."""
+    executed = []
+    for job in jobs:
+        current = now or datetime.utcnow()
+        scheduled_for = job.schedule(current)
+        run_id = claim(job, scheduled_for, current)
+        if run_id is None:
+            continue
+        started = time.perf_counter()
+        try:
+            rows = job.func()
+        except Exception as exc:
+            logger.exception("Trabajo %s (%s) falló", job.job_id, scheduled_for)
+            _finish(run_id, started, error=f"{type(exc).__name__}: {exc}")
+            executed.append({"job_id": job.job_id, "scheduled_for": scheduled_for, "status": "failed"})
+            continue
+        _finish(run_id, started, rows=rows)
+        logger.info("Trabajo %s (%s): %s filas", job.job_id, scheduled_for, rows)
+        executed.append({"job_id": job.job_id, "scheduled_for": scheduled_for, "status": "succeeded", "rows": rows})
+    return executed
+
+
+def schedule_checks(scheduler, job_list: List[Job], interval: int) -> None:
+    """Programa en un scheduler de APScheduler una revisión periódica por trabajo.
+
+    Cada trabajo tiene su propia revisión para que uno largo no retrase a los
+    demás; la concurrencia la limita el ejecutor del scheduler. La primera
+    revisión es inmediata para recuperar lo perdido mientras el proceso
+    estuvo detenido.
+    """
+    for job in job_list:
+        scheduler.add_job(
+            run_due,
+            "interval",
+            args=[[job]],
+            seconds=interval,
+            id=f"job:{job.job_id}",
+            name=job.job_id,
+            next_run_time=datetime.now(timezone.utc),
+            max_instances=1,
+            coalesce=True,
+        )
@@ -1,7 +1,9 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, Numeric, String, Text
+from sqlalchemy import (
+    BigInteger, Column, Date, DateTime, Float, ForeignKey, Integer, Numeric, String, Text, UniqueConstraint,
+)
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -62,6 +64,33 @@ class Equipment(Base):
     maintenance_tasks = relationship("MaintenanceTask", back_populates="equipment")
 
 
+# Mantenida por triggers sobre equipment (ver db/schema.sql)
+class EquipmentCounter(Base):
+    __tablename__ = "equipment_counters"
+
+    dimension = Column(String(20), primary_key=True)
+    value = Column(String(120), primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+
+
+# Cambios de los contadores aún no consolidados en equipment_counters
+class EquipmentCounterDelta(Base):
+    __tablename__ = "equipment_counter_deltas"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    dimension = Column(String(20), nullable=False)
+    value = Column(String(120), nullable=False)
+    delta = Column(BigInteger, nullable=False)
+
+
+# Mantenida por triggers diferidos (ver db/schema.sql); la usan los ETag
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    name = Column(String(63), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
 class EquipmentMovement(Base):
     __tablename__ = "equipment_movements"
 
@@ -76,6 +105,20 @@ class EquipmentMovement(Base):
     equipment = relationship("Equipment", back_populates="movements")
 
 
+class EquipmentStatusAudit(Base):
+    __tablename__ = "equipment_status_audit"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    run_id = Column(UUID(as_uuid=True), nullable=False)
+    equipment_id = Column(UUID(as_uuid=True), ForeignKey("equipment.id"))
+    asset_tag = Column(String(80), nullable=False)
+    purchase_date = Column(Date)
+    from_status = Column(String(40))
+    to_status = Column(String(40), nullable=False)
+    reason = Column(String(120))
+    changed_at = Column(DateTime, default=datetime.utcnow)
+
+
 class MaintenanceTask(Base):
     __tablename__ = "maintenance_tasks"
 
@@ -88,10 +131,21 @@ class MaintenanceTask(Base):
     assigned_team = Column(String(120))
     reminder_token = Column(String(120))
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     equipment = relationship("Equipment", back_populates="maintenance_tasks")
     logs = relationship("MaintenanceLog", back_populates="task")
 
+    # Datos del equipo en los listados de tareas, para que los clientes no
+    # tengan que descargar el inventario sólo para mostrar el asset tag.
+    @property
+    def asset_tag(self):
+        return self.equipment.asset_tag if self.equipment else None
+
+    @property
+    def equipment_name(self):
+        return self.equipment.name if self.equipment else None
+
 
 class MaintenanceLog(Base):
     __tablename__ = "maintenance_logs"
@@ -106,3 +160,38 @@ class MaintenanceLog(Base):
 
     task = relationship("MaintenanceTask", back_populates="logs")
 
+
+
+class ReminderDelivery(Base):
+    __tablename__ = "reminder_deliveries"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    batch_token = Column(String(120), nullable=False)
+    team = Column(String(120), nullable=False)
+    sink = Column(String(20), nullable=False)
+    task_count = Column(Integer, nullable=False)
+    payload = Column(Text, nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    claimed_until = Column(DateTime)
+    sent_at = Column(DateTime)
+
+# Una fila por horario de cada trabajo programado (ver common/jobs.py)
+class JobRun(Base):
+    __tablename__ = "job_runs"
+    __table_args__ = (UniqueConstraint("job_id", "scheduled_for"),)
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_id = Column(String(80), nullable=False)
+    scheduled_for = Column(DateTime, nullable=False)
+    owner = Column(String(120))
+    status = Column(String(20), nullable=False, default="running")
+    attempt = Column(Integer, nullable=False, default=1)
+    rows = Column(Integer)
+    error = Column(Text)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    duration_seconds = Column(Float)
+    lease_expires_at = Column(DateTime)
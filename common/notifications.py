@@ -0,0 +1,109 @@
+"""Destinos de entrega de notificaciones: correo SMTP, webhook y archivo.
+
+Cada destino tiene un ``name`` y un ``send(message)`` que lanza una excepción
+si la entrega falla. ``message`` es un dict serializable en JSON con al menos
+``team``, ``subject`` y ``body``; el resto de claves viaja tal cual en el
+webhook y en el archivo.
+"""
+
+import json
+import os
+import smtplib
+import threading
+from email.message import EmailMessage
+from typing import Dict, List
+
+import httpx
+
+
+NOTIFY_TIMEOUT = float(os.getenv("NOTIFY_TIMEOUT", "10"))
+
+SMTP_HOST = os.getenv("SMTP_HOST", "localhost")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "25"))
+SMTP_USER = os.getenv("SMTP_USER")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "false").lower() in ("1", "true", "yes")
+SMTP_SENDER = os.getenv("SMTP_SENDER", "mantenimiento@localhost")
+# Destinatario por defecto y, opcionalmente, uno o más por equipo:
+# "redes=redes@uni.edu;jefe@uni.edu,soporte=soporte@uni.edu"
+NOTIFICATION_EMAIL = os.getenv("NOTIFICATION_EMAIL")
+TEAM_EMAILS = {
+    team.strip(): [address.strip() for address in addresses.split(";") if address.strip()]
+    for team, _, addresses in (
+        entry.partition("=") for entry in os.getenv("REMINDER_TEAM_EMAILS", "").split(",") if "=" in entry
+    )
+}
+
+WEBHOOK_URL = os.getenv("REMINDER_WEBHOOK_URL")
+NOTIFY_FILE = os.getenv("REMINDER_FILE", "reminders.ndjson")
+
+
+class FileSink:
+    """Una línea JSON por mensaje; útil en desarrollo y como respaldo auditable."""
+
+    name = "file"
+
+    def __init__(self, path: str = NOTIFY_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send(self, message: Dict) -> None:
+        line = json.dumps(message, ensure_ascii=False, default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as output:
+            output.write(line + "\n")
+
+
+class SmtpSink:
+    name = "smtp"
+
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, sender: str = SMTP_SENDER):
+        self.host = host
+        self.port = port
+        self.sender = sender
+
+    def recipients(self, team: str) -> List[str]:
+        recipients = TEAM_EMAILS.get(team) or ([NOTIFICATION_EMAIL] if NOTIFICATION_EMAIL else [])
+        if not recipients:
+            raise ValueError(f"Sin destinatario para el equipo {team!r}: define NOTIFICATION_EMAIL")
+        return recipients
+
+    def send(self, message: Dict) -> None:
+        email = EmailMessage()
+        email["From"] = self.sender
+        email["To"] = ", ".join(self.recipients(message["team"]))
+        email["Subject"] = message["subject"]
+        email.set_content(message["body"])
+        with smtplib.SMTP(self.host, self.port, timeout=NOTIFY_TIMEOUT) as smtp:
+            if SMTP_STARTTLS:
+                smtp.starttls()
+            if SMTP_USER:
+                smtp.login(SMTP_USER, SMTP_PASSWORD or "")
+            smtp.send_message(email)
+
+
+class WebhookSink:
+    name = "webhook"
+
+    def __init__(self, url: str | None = WEBHOOK_URL):
+        if not url:
+            raise ValueError("REMINDER_WEBHOOK_URL no está definido")
+        self.url = url
+        self._client = httpx.Client(timeout=NOTIFY_TIMEOUT)
+
+    def send(self, message: Dict) -> None:
+        response = self._client.post(self.url, content=json.dumps(message, default=str),
+                                     headers={"Content-Type": "application/json"})
+        response.raise_for_status()
+
+
+SINKS = {sink.name: sink for sink in (FileSink, SmtpSink, WebhookSink)}
+
+
+def build_sinks(names: str) -> Dict[str, object]:
+    """Instancia los destinos de una lista separada por comas, p. ej. ``"smtp,file"``."""
+    sinks = {}
+    for name in (value.strip() for value in names.split(",") if value.strip()):
+        if name not in SINKS:
+            raise ValueError(f"Destino de notificación desconocido: {name}")
+        sinks[name] = SINKS[name]()
+    return sinks
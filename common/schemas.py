@@ -3,7 +3,7 @@ from decimal import Decimal
 from typing import Optional, List
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, root_validator
 
 
 class SupplierBase(BaseModel):
@@ -85,6 +85,39 @@ class EquipmentOut(EquipmentBase):
         orm_mode = True
 
 
+class EquipmentPage(BaseModel):
+    items: List[EquipmentOut]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total_estimate: int
+
+
+class EquipmentSearchHit(EquipmentOut):
+    rank: float
+
+
+class EquipmentSearchPage(BaseModel):
+    items: List[EquipmentSearchHit]
+    next_cursor: Optional[str] = None
+
+
+class ImportRowError(BaseModel):
+    row: int
+    asset_tag: Optional[str] = None
+    error: str
+
+
+class EquipmentImportReport(BaseModel):
+    received: int
+    inserted: int
+    updated: int
+    skipped: int
+    failed: int
+    errors: List[ImportRowError]
+    elapsed_seconds: float
+    rows_per_second: float
+
+
 class EquipmentMovementBase(BaseModel):
     equipment_id: UUID
     from_location: Optional[str] = None
@@ -101,6 +134,35 @@ class EquipmentMovementOut(EquipmentMovementBase):
         orm_mode = True
 
 
+class MovementPage(BaseModel):
+    items: List[EquipmentMovementOut]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+class BulkMovementCreate(BaseModel):
+    equipment_ids: Optional[List[UUID]] = Field(None, max_items=50000)
+    from_location: Optional[str] = None
+    to_location: str
+    assigned_to: Optional[str] = None
+    notes: Optional[str] = None
+
+    @root_validator(skip_on_failure=True)
+    def check_selection(cls, values):
+        if not values.get("equipment_ids") and not values.get("from_location"):
+            raise ValueError("Indica equipment_ids o from_location")
+        return values
+
+
+class BulkMovementSummary(BaseModel):
+    matched: int
+    moved: int
+    unchanged: int
+    not_found: List[UUID]
+    to_location: str
+    elapsed_seconds: float
+
+
 class MaintenanceTaskBase(BaseModel):
     equipment_id: UUID
     scheduled_for: date
@@ -122,11 +184,20 @@ class MaintenanceTaskUpdate(BaseModel):
 class MaintenanceTaskOut(MaintenanceTaskBase):
     id: UUID
     status: str
+    asset_tag: Optional[str] = None
+    equipment_name: Optional[str] = None
 
     class Config:
         orm_mode = True
 
 
+class MaintenanceTaskPage(BaseModel):
+    items: List[MaintenanceTaskOut]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total_estimate: int
+
+
 class MaintenanceLogBase(BaseModel):
     task_id: UUID
     completed_on: date
@@ -142,6 +213,93 @@ class MaintenanceLogOut(MaintenanceLogBase):
         orm_mode = True
 
 
+class MaintenanceLogPage(BaseModel):
+    items: List[MaintenanceLogOut]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+    total_estimate: int
+
+
+class ObsolescenceCandidate(BaseModel):
+    asset_tag: str
+    purchase_date: date
+    location: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+
+class ObsolescencePreview(BaseModel):
+    cutoff: date
+    candidates: int
+    sample: List[ObsolescenceCandidate]
+
+
+class ObsolescenceReport(BaseModel):
+    run_id: UUID
+    cutoff: date
+    updated: int
+    chunks: int
+    elapsed_seconds: float
+    rows_per_second: float
+
+
+class EquipmentStatusAuditOut(BaseModel):
+    run_id: UUID
+    equipment_id: Optional[UUID] = None
+    asset_tag: str
+    purchase_date: Optional[date] = None
+    from_status: Optional[str] = None
+    to_status: str
+    reason: Optional[str] = None
+    changed_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class ReminderRunSummary(BaseModel):
+    tasks: int
+    digests: int
+    sent: int
+    failed: int
+    elapsed_seconds: float
+
+
+class ReminderDeliveryOut(BaseModel):
+    id: UUID
+    batch_token: str
+    team: str
+    sink: str
+    task_count: int
+    status: str
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    claimed_until: Optional[datetime] = None
+    sent_at: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class JobRunOut(BaseModel):
+    id: UUID
+    job_id: str
+    scheduled_for: datetime
+    owner: Optional[str] = None
+    status: str
+    attempt: int
+    rows: Optional[int] = None
+    error: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+
+    class Config:
+        orm_mode = True
+
+
 class DashboardMetric(BaseModel):
     equipment_by_status: dict
     equipment_by_location: dict
@@ -1,4 +1,14 @@
-from datetime import date
+import base64
+import hashlib
+import json
+import uuid
+from datetime import date, datetime
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Query, Session
+
+from . import models
 
 
 def compute_age(purchase_date: date | None) -> int:
@@ -8,7 +18,140 @@ def compute_age(purchase_date: date | None) -> int:
     return max(0, today.year - purchase_date.year - ((today.month, today.day) < (purchase_date.month, purchase_date.day)))
 
 
+def table_etag(db: Session, *tables, extra: str = "") -> str:
+    """ETag débil a partir de la versión de cada tabla.
+
+    ``tables`` admite modelos o nombres de versión de ``table_versions`` (p. ej.
+    ``"equipment_labels"``). En PostgreSQL las versiones las mantienen
+    triggers y leerlas es una búsqueda por clave; en otros motores, sin esos
+    triggers, se usa el conteo y la última modificación de cada modelo.
+    """
+    names = [table if isinstance(table, str) else table.__tablename__ for table in tables]
+    parts = [extra]
+    if db.bind.dialect.name == "postgresql":
+        versions = dict(
+            db.query(models.TableVersion.name, models.TableVersion.version)
+            .filter(models.TableVersion.name.in_(names))
+            .all()
+        )
+        parts.extend(f"{name}:{versions.get(name, 0)}" for name in names)
+    else:
+        for model in tables:
+            if isinstance(model, str):
+                continue
+            stamp = model.updated_at if hasattr(model, "updated_at") else model.created_at
+            count, latest = db.query(func.count(), func.max(stamp)).select_from(model).one()
+            parts.append(f"{model.__tablename__}:{count}:{latest.isoformat() if latest else ''}")
+    return 'W/"' + hashlib.sha1("|".join(parts).encode()).hexdigest() + '"'
+
+
+def content_etag(payload) -> str:
+    """ETag débil a partir del propio contenido, para respuestas baratas de calcular."""
+    raw = json.dumps(payload, sort_keys=True, default=str).encode()
+    return 'W/"' + hashlib.sha1(raw).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def encode_cursor(payload: dict) -> str:
+    raw = json.dumps(payload, default=str, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if not isinstance(payload, dict) or not isinstance(payload.get("k"), list):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return payload
+
+
+def cursor_option(position: dict | None, key: str, default: str, allowed) -> str:
+    """Opción de orden guardada en el cursor (``sort``, ``order``), o ``default``."""
+    if not position or key not in position:
+        return default
+    value = position[key]
+    if not isinstance(value, str) or value not in allowed:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return value
+
+
+def _cursor_value(column, value):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type in (datetime, date, uuid.UUID) and not isinstance(value, str):
+        raise ValueError(value)
+    if python_type in (datetime, date):
+        return python_type.fromisoformat(value)
+    if python_type is uuid.UUID:
+        return uuid.UUID(value)
+    if not isinstance(value, python_type):
+        raise ValueError(value)
+    return value
+
+
+def keyset_page(query: Query, columns: list, limit: int, cursor: dict | None = None, descending: bool = False, **context) -> dict:
+    """Página por conjunto de claves ordenada por ``columns`` (la última debe ser única).
+
+    ``cursor`` es el cursor ya decodificado; ``context`` se guarda en los
+    cursores generados para que la página siguiente conserve el orden pedido.
+    """
+    backwards = bool(cursor) and cursor.get("d") == "prev"
+    reverse = descending != backwards
+    if cursor:
+        if len(cursor["k"]) != len(columns):
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+        try:
+            bound = tuple_(*(_cursor_value(column, value) for column, value in zip(columns, cursor["k"])))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+        key = tuple_(*columns)
+        query = query.filter(key < bound if reverse else key > bound)
+    query = query.order_by(*(column.desc() if reverse else column.asc() for column in columns))
+    rows = query.limit(limit + 1).all()
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    def make(row, direction: str) -> str:
+        return encode_cursor({**context, "k": [getattr(row, column.key) for column in columns], "d": direction})
 
+    has_next = more if not backwards else bool(cursor)
+    has_prev = more if backwards else bool(cursor)
+    return {
+        "items": rows,
+        "next_cursor": make(rows[-1], "next") if rows and has_next else None,
+        "prev_cursor": make(rows[0], "prev") if rows and has_prev else None,
+    }
 
 
+def estimate_count(db: Session, query: Query, exact_below: int = 1000) -> int:
+    """Total aproximado de ``query`` sin recorrer la tabla.
 
+    En PostgreSQL usa la estimación de filas del planificador; si es pequeña (o
+    el motor es otro) hace el conteo exacto, que entonces es barato.
+    """
+    if db.bind.dialect.name == "postgresql":
+        compiled = query.order_by(None).statement.compile(dialect=db.bind.dialect)
+        params = {key: str(value) if isinstance(value, uuid.UUID) else value for key, value in compiled.params.items()}
+        plan = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate >= exact_below:
+            return estimate
+    return query.order_by(None).count()
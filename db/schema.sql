@@ -1,4 +1,5 @@
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- Tabla de usuarios para autenticación
 CREATE TABLE IF NOT EXISTS users (
@@ -15,6 +16,15 @@ CREATE TABLE IF NOT EXISTS users (
 
 CREATE INDEX IF NOT EXISTS idx_users_username ON users(username);
 
+-- Tokens de sesión revocados (logout) hasta su expiración
+CREATE TABLE IF NOT EXISTS revoked_tokens (
+    jti VARCHAR(64) PRIMARY KEY,
+    expires_at TIMESTAMPTZ NOT NULL,
+    revoked_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires ON revoked_tokens(expires_at);
+
 CREATE TABLE IF NOT EXISTS suppliers (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     name VARCHAR(150) NOT NULL,
@@ -73,9 +83,13 @@ CREATE TABLE IF NOT EXISTS maintenance_tasks (
     status VARCHAR(30) DEFAULT 'scheduled',
     assigned_team VARCHAR(120),
     reminder_token VARCHAR(120),
-    created_at TIMESTAMP DEFAULT NOW()
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
 );
 
+-- Bases creadas antes de que existiera la columna
+ALTER TABLE maintenance_tasks ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT NOW();
+
 CREATE TABLE IF NOT EXISTS maintenance_logs (
     id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
     task_id UUID REFERENCES maintenance_tasks (id) ON DELETE CASCADE,
@@ -86,6 +100,220 @@ CREATE TABLE IF NOT EXISTS maintenance_logs (
     created_at TIMESTAMP DEFAULT NOW()
 );
 
+-- Cambios de estado aplicados por trabajos masivos (p. ej. obsolescencia);
+-- run_id agrupa los equipos modificados en una misma ejecución.
+CREATE TABLE IF NOT EXISTS equipment_status_audit (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    run_id UUID NOT NULL,
+    equipment_id UUID REFERENCES equipment (id) ON DELETE SET NULL,
+    asset_tag VARCHAR(80) NOT NULL,
+    purchase_date DATE,
+    from_status VARCHAR(40),
+    to_status VARCHAR(40) NOT NULL,
+    reason VARCHAR(120),
+    changed_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_equipment_status_audit_run ON equipment_status_audit(run_id, changed_at DESC);
+CREATE INDEX IF NOT EXISTS idx_equipment_status_audit_changed ON equipment_status_audit(changed_at DESC);
+
+-- Recordatorios de mantenimiento: un resumen por equipo asignado y destino
+-- (smtp, webhook, file). batch_token coincide con maintenance_tasks.reminder_token
+-- de las tareas incluidas; los reintentos sólo reenvían las filas no enviadas.
+-- Una ejecución reserva sus filas (status = 'sending') antes de enviarlas.
+CREATE TABLE IF NOT EXISTS reminder_deliveries (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    batch_token VARCHAR(120) NOT NULL,
+    team VARCHAR(120) NOT NULL,
+    sink VARCHAR(20) NOT NULL,
+    task_count INT NOT NULL,
+    payload TEXT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending','sending','sent','failed')),
+    attempts INT NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT NOW(),
+    -- Reserva de una entrega en curso; al vencer, otra ejecución puede retomarla
+    claimed_until TIMESTAMP,
+    sent_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_reminder_deliveries_unsent
+    ON reminder_deliveries(created_at) WHERE status <> 'sent';
+CREATE INDEX IF NOT EXISTS idx_reminder_deliveries_batch ON reminder_deliveries(batch_token);
+
+-- Tareas pendientes de recordatorio (reminder_token se limpia al reprogramar)
+CREATE INDEX IF NOT EXISTS idx_maintenance_tasks_due_reminders
+    ON maintenance_tasks(scheduled_for) WHERE status = 'scheduled' AND reminder_token IS NULL;
+
+-- Ejecuciones de los trabajos programados: la fila (job_id, scheduled_for)
+-- reserva cada horario para una sola réplica; lease_expires_at permite que
+-- otra la retome si el proceso que la ejecutaba murió.
+CREATE TABLE IF NOT EXISTS job_runs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    job_id VARCHAR(80) NOT NULL,
+    scheduled_for TIMESTAMP NOT NULL,
+    owner VARCHAR(120),
+    status VARCHAR(20) NOT NULL DEFAULT 'running' CHECK (status IN ('running','succeeded','failed')),
+    attempt INT NOT NULL DEFAULT 1,
+    rows INT,
+    error TEXT,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    duration_seconds DOUBLE PRECISION,
+    lease_expires_at TIMESTAMP,
+    UNIQUE (job_id, scheduled_for)
+);
+
+-- Versión de cada listado para sus ETag: leerla es una búsqueda por clave en
+-- vez de contar la tabla. Los triggers son diferidos y suman una sola vez por
+-- transacción, al confirmarla, así que el bloqueo de la fila dura lo que el
+-- COMMIT.
+CREATE TABLE IF NOT EXISTS table_versions (
+    name VARCHAR(63) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION table_versions_bump() RETURNS trigger AS $$
+DECLARE
+    key TEXT := coalesce(TG_ARGV[0], TG_TABLE_NAME);
+BEGIN
+    IF current_setting('table_versions.' || key, true) IS DISTINCT FROM txid_current()::text THEN
+        PERFORM set_config('table_versions.' || key, txid_current()::text, true);
+        INSERT INTO table_versions (name, version) VALUES (key, 1)
+        ON CONFLICT (name) DO UPDATE SET version = table_versions.version + 1;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS equipment_version ON equipment;
+CREATE CONSTRAINT TRIGGER equipment_version
+    AFTER INSERT OR UPDATE OR DELETE ON equipment DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION table_versions_bump();
+DROP TRIGGER IF EXISTS maintenance_tasks_version ON maintenance_tasks;
+CREATE CONSTRAINT TRIGGER maintenance_tasks_version
+    AFTER INSERT OR UPDATE OR DELETE ON maintenance_tasks DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION table_versions_bump();
+DROP TRIGGER IF EXISTS maintenance_logs_version ON maintenance_logs;
+CREATE CONSTRAINT TRIGGER maintenance_logs_version
+    AFTER INSERT OR UPDATE OR DELETE ON maintenance_logs DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION table_versions_bump();
+DROP TRIGGER IF EXISTS suppliers_version ON suppliers;
+CREATE CONSTRAINT TRIGGER suppliers_version
+    AFTER INSERT OR UPDATE OR DELETE ON suppliers DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION table_versions_bump();
+DROP TRIGGER IF EXISTS supplier_contracts_version ON supplier_contracts;
+CREATE CONSTRAINT TRIGGER supplier_contracts_version
+    AFTER INSERT OR UPDATE OR DELETE ON supplier_contracts DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW EXECUTE FUNCTION table_versions_bump();
+-- Los listados de tareas muestran asset_tag y name del equipo: sólo esos campos
+-- invalidan sus ETag, no cualquier escritura en equipment.
+DROP TRIGGER IF EXISTS equipment_labels_version ON equipment;
+CREATE CONSTRAINT TRIGGER equipment_labels_version
+    AFTER UPDATE OF asset_tag, name ON equipment DEFERRABLE INITIALLY DEFERRED
+    FOR EACH ROW WHEN (OLD.asset_tag IS DISTINCT FROM NEW.asset_tag OR OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION table_versions_bump('equipment_labels');
+
+-- Paginación por conjunto de claves del inventario (orden estable + filtros)
+CREATE INDEX IF NOT EXISTS idx_equipment_created_id ON equipment(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_equipment_status_created_id ON equipment(status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_equipment_location_created_id ON equipment(location, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_equipment_status_asset_tag ON equipment(status, asset_tag);
+CREATE INDEX IF NOT EXISTS idx_equipment_location_asset_tag ON equipment(location, asset_tag);
+
+-- Búsqueda de equipos: prefijo de asset tag, texto completo y trigramas. La
+-- expresión debe coincidir con SEARCH_DOCUMENT del servicio de equipos.
+CREATE INDEX IF NOT EXISTS idx_equipment_asset_tag_prefix
+    ON equipment(lower(asset_tag) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS idx_equipment_search_fts ON equipment USING GIN (
+    to_tsvector('simple', lower(coalesce(asset_tag, '') || ' ' || coalesce(name, '') || ' ' || coalesce(model, '')
+        || ' ' || coalesce(serial_number, '') || ' ' || coalesce(location, '')))
+);
+CREATE INDEX IF NOT EXISTS idx_equipment_search_trgm ON equipment USING GIN (
+    lower(coalesce(asset_tag, '') || ' ' || coalesce(name, '') || ' ' || coalesce(model, '')
+        || ' ' || coalesce(serial_number, '') || ' ' || coalesce(location, '')) gin_trgm_ops
+);
+
+-- Candidatos del trabajo de obsolescencia (status = 'operational' AND purchase_date <= corte)
+CREATE INDEX IF NOT EXISTS idx_equipment_status_purchase ON equipment(status, purchase_date);
+
+-- Listados paginados de tareas (por scheduled_for) y bitácoras (por created_at)
+CREATE INDEX IF NOT EXISTS idx_maintenance_tasks_scheduled_id ON maintenance_tasks(scheduled_for, id);
+CREATE INDEX IF NOT EXISTS idx_maintenance_tasks_status_scheduled_id
+    ON maintenance_tasks(status, scheduled_for, id);
+CREATE INDEX IF NOT EXISTS idx_maintenance_tasks_team_scheduled_id
+    ON maintenance_tasks(assigned_team, scheduled_for, id);
+CREATE INDEX IF NOT EXISTS idx_maintenance_tasks_equipment_scheduled_id
+    ON maintenance_tasks(equipment_id, scheduled_for, id);
+CREATE INDEX IF NOT EXISTS idx_maintenance_logs_created_id ON maintenance_logs(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_maintenance_logs_task_created_id ON maintenance_logs(task_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_maintenance_logs_completed_on ON maintenance_logs(completed_on);
+
+-- Historial por equipo: rangos de fechas, "últimos N" y paginación por cursor
+CREATE INDEX IF NOT EXISTS idx_equipment_movements_equipment_moved
+    ON equipment_movements(equipment_id, moved_at DESC, id DESC);
+
+-- Contadores del inventario por estado y por ubicación ('' = sin valor). Los
+-- triggers de equipment no actualizan equipment_counters: en la misma
+-- transacción que cada escritura (altas, cambios, importaciones, traslados y
+-- trabajos masivos) añaden una fila por grupo a equipment_counter_deltas, que
+-- no bloquea a ninguna otra escritura. El servicio de equipos consolida los
+-- deltas en equipment_counters y las lecturas suman ambas tablas.
+CREATE TABLE IF NOT EXISTS equipment_counters (
+    dimension VARCHAR(20) NOT NULL,
+    value VARCHAR(120) NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (dimension, value)
+);
+
+CREATE TABLE IF NOT EXISTS equipment_counter_deltas (
+    id BIGSERIAL PRIMARY KEY,
+    dimension VARCHAR(20) NOT NULL,
+    value VARCHAR(120) NOT NULL,
+    delta BIGINT NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION equipment_counters_apply() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO equipment_counter_deltas (dimension, value, delta)
+        SELECT g.dimension, g.value, count(*)
+        FROM new_rows, LATERAL (VALUES ('status', coalesce(new_rows.status, '')),
+                                       ('location', coalesce(new_rows.location, ''))) AS g(dimension, value)
+        GROUP BY g.dimension, g.value;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO equipment_counter_deltas (dimension, value, delta)
+        SELECT g.dimension, g.value, -count(*)
+        FROM old_rows, LATERAL (VALUES ('status', coalesce(old_rows.status, '')),
+                                       ('location', coalesce(old_rows.location, ''))) AS g(dimension, value)
+        GROUP BY g.dimension, g.value;
+    ELSE
+        -- Sólo se registran los grupos cuyo saldo cambió
+        INSERT INTO equipment_counter_deltas (dimension, value, delta)
+        SELECT g.dimension, g.value, sum(g.delta)
+        FROM (
+            SELECT 'status' AS dimension, coalesce(status, '') AS value, -1 AS delta FROM old_rows
+            UNION ALL SELECT 'location', coalesce(location, ''), -1 FROM old_rows
+            UNION ALL SELECT 'status', coalesce(status, ''), 1 FROM new_rows
+            UNION ALL SELECT 'location', coalesce(location, ''), 1 FROM new_rows
+        ) AS g
+        GROUP BY g.dimension, g.value
+        HAVING sum(g.delta) <> 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE TRIGGER equipment_counters_insert
+    AFTER INSERT ON equipment REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION equipment_counters_apply();
+CREATE OR REPLACE TRIGGER equipment_counters_update
+    AFTER UPDATE ON equipment REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION equipment_counters_apply();
+CREATE OR REPLACE TRIGGER equipment_counters_delete
+    AFTER DELETE ON equipment REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION equipment_counters_apply();
+
 CREATE OR REPLACE VIEW equipment_health AS
 SELECT
     e.id,
@@ -42,6 +42,7 @@ def login_page():
                     if response.get("success"):
                         user_data = response.get("user", {})
                         st.session_state.authenticated = True
+                        st.session_state.token = response.get("token")
                         st.session_state.username = user_data.get("username", username)
                         st.session_state.user_role = user_data.get("role", "user")
                         st.session_state.user_full_name = user_data.get("full_name", username)
@@ -77,15 +78,21 @@ def login_page():
     """)
 
 def logout():
+    # Revocar el token en el gateway; si falla, expirará por sí solo
+    try:
+        api_request("POST", "/auth/logout")
+    except requests.RequestException:
+        pass
     # Limpiar variables de sesión relacionadas con autenticación
     st.session_state.authenticated = False
     st.session_state.username = None
+    st.session_state.token = None
     if "user_role" in st.session_state:
         del st.session_state.user_role
     if "user_full_name" in st.session_state:
         del st.session_state.user_full_name
     # Invalidar todos los cachés
-    invalidate_caches(fetch_dashboard, fetch_suppliers, fetch_equipment, fetch_tasks, fetch_logs, fetch_upcoming_tasks)
+    invalidate_caches(fetch_dashboard, fetch_suppliers, fetch_equipment, search_equipment, fetch_maintenance_page, fetch_upcoming_tasks)
     # Rerun seguro
     try:
         st.rerun()
@@ -98,6 +105,9 @@ def api_request(method: str, path: str, **kwargs):
     url = f"{API_GATEWAY_URL}{path}"
     if "json" in kwargs:
         kwargs["json"] = _serialize_payload(kwargs["json"])
+    token = st.session_state.get("token")
+    if token:
+        kwargs["headers"] = {**kwargs.get("headers", {}), "Authorization": f"Bearer {token}"}
     response = requests.request(method, url, timeout=30, **kwargs)
     response.raise_for_status()
     return response
@@ -113,26 +123,73 @@ def fetch_dashboard():
 def fetch_suppliers():
     return api_json("GET", "/suppliers")
 
+EQUIPMENT_PAGE_SIZE = 50
+
+@st.cache_data(ttl=60)
+def fetch_equipment(status: str | None = None, location: str | None = None, cursor: str | None = None):
+    params = {"limit": EQUIPMENT_PAGE_SIZE}
+    if status:
+        params["status"] = status
+    if location:
+        params["location"] = location
+    if cursor:
+        params["cursor"] = cursor
+    return api_json("GET", "/equipment", params=params)
+
 @st.cache_data(ttl=60)
-def fetch_equipment(status: str | None = None, location: str | None = None):
-    params = {}
+def search_equipment(query: str, status: str | None = None, location: str | None = None, cursor: str | None = None):
+    params = {"q": query, "limit": EQUIPMENT_PAGE_SIZE}
     if status:
         params["status"] = status
     if location:
         params["location"] = location
-    return api_json("GET", "/equipment", params=params or None)
+    if cursor:
+        params["cursor"] = cursor
+    return api_json("GET", "/equipment/search", params=params)
 
 @st.cache_data(ttl=60)
 def fetch_upcoming_tasks():
     return api_json("GET", "/maintenance/upcoming")
 
-@st.cache_data(ttl=60)
-def fetch_tasks():
-    return api_json("GET", "/maintenance/tasks")
+def api_batch(*paths):
+    """Varias lecturas GET en una sola ida y vuelta al gateway (``POST /batch``).
+
+    Cada elemento es una ruta o una tupla ``(ruta, parámetros)``.
+    """
+    items = [path if isinstance(path, tuple) else (path, None) for path in paths]
+    payload = {"requests": [{"method": "GET", "path": path, "params": params} for path, params in items]}
+    results = api_json("POST", "/batch", json=payload)["responses"]
+    for (path, _), result in zip(items, results):
+        if result["status"] >= 400:
+            raise requests.HTTPError(f"{path}: {result['status']} {result['body']}")
+    return [result["body"] for result in results]
+
+MAINTENANCE_PAGE_SIZE = 50
 
 @st.cache_data(ttl=60)
-def fetch_logs():
-    return api_json("GET", "/maintenance/logs")
+def fetch_maintenance_page(
+    status: str | None = None,
+    team: str | None = None,
+    tasks_cursor: str | None = None,
+    logs_cursor: str | None = None,
+):
+    task_params = {"limit": MAINTENANCE_PAGE_SIZE}
+    if status:
+        task_params["status"] = status
+    if team:
+        task_params["team"] = team
+    if tasks_cursor:
+        task_params["cursor"] = tasks_cursor
+    log_params = {"limit": MAINTENANCE_PAGE_SIZE}
+    if logs_cursor:
+        log_params["cursor"] = logs_cursor
+    tasks, logs, pending = api_batch(
+        ("/maintenance/tasks", task_params),
+        ("/maintenance/logs", log_params),
+        # Para el formulario de bitácoras: las pendientes más próximas
+        ("/maintenance/tasks", {"status": "scheduled", "order": "asc", "limit": 200}),
+    )
+    return tasks, logs, pending["items"]
 
 @st.cache_data(ttl=60)
 def fetch_report_file(fmt: str):
@@ -150,6 +207,19 @@ def _serialize_payload(payload):
         return payload.isoformat()
     return payload
 
+EMPTY_METRICS = {
+    "equipment_by_status": {},
+    "equipment_by_location": {},
+    "maintenance_costs": {},
+    "aging_profile": {},
+}
+
+def dashboard_metrics(data: dict) -> dict:
+    """Métricas del dashboard, avisando de las llamadas que el gateway no completó."""
+    for item in data.get("degraded", []):
+        st.warning(f"⚠️ Datos parciales: no se pudo obtener '{item['call']}' ({item['reason']})")
+    return data.get("metrics") or EMPTY_METRICS
+
 def invalidate_caches(*functions):
     for func in functions:
         func.clear()
@@ -218,14 +288,19 @@ def render_metric_charts(metrics: dict):
         else:
             st.info("📭 Sin datos de antigüedad.")
 
+def equipment_label(tasks: pd.DataFrame) -> pd.Series:
+    """Nombre o asset tag del equipo de cada tarea (los listados de tareas ya los incluyen)."""
+    label = tasks["equipment_name"] if "equipment_name" in tasks else pd.Series(None, index=tasks.index)
+    if "asset_tag" in tasks:
+        label = label.fillna(tasks["asset_tag"])
+    return label.fillna(tasks["equipment_id"].astype(str))
+
 def render_dashboard():
     st.header("📊 Dashboard Principal")
     data = fetch_dashboard()
-    metrics = data["metrics"]
+    metrics = dashboard_metrics(data)
     total_equipment = sum(metrics["equipment_by_status"].values())
-    equipment = fetch_equipment()
-    equipment_map = {str(item["id"]): (item.get("name") or item.get("asset_tag") or str(item["id"])) for item in (equipment or [])}
-    
+
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("💻 Equipos totales", total_equipment)
     col2.metric("📍 Ubicaciones", len(metrics["equipment_by_location"]))
@@ -235,7 +310,7 @@ def render_dashboard():
     render_metric_charts(metrics)
 
     st.subheader("📅 Calendario de mantenimientos próximos")
-    upcoming = pd.DataFrame(fetch_upcoming_tasks())
+    upcoming = pd.DataFrame(data.get("upcoming_tasks") or [])
     if upcoming.empty:
         st.info("📭 No hay tareas programadas en la ventana de recordatorio.")
     else:
@@ -245,9 +320,7 @@ def render_dashboard():
             st.info("📭 No hay tareas pendientes en la ventana de recordatorio.")
             return
         upcoming["scheduled_for"] = pd.to_datetime(upcoming["scheduled_for"])
-        upcoming["equipo"] = (
-            upcoming["equipment_id"].astype(str).map(equipment_map).fillna(upcoming["equipment_id"])
-        )
+        upcoming["equipo"] = equipment_label(upcoming)
         # Normalizamos a fecha para calcular los días restantes de forma segura
         upcoming["días_restantes"] = (
             upcoming["scheduled_for"].dt.normalize() - pd.Timestamp(date.today())
@@ -355,18 +428,40 @@ def render_equipment():
         ["Todos", "operational", "maintenance", "retired", "obsolete"],
     )
     location_filter = filters[1].text_input("🔍 Filtrar por ubicación")
+    search = st.text_input("🔎 Buscar por asset tag, nombre, modelo, serie o ubicación").strip()
 
     status_param = None if status_filter == "Todos" else status_filter
-    equipment = fetch_equipment(status_param, location_filter or None)
+    # Al cambiar los filtros se vuelve a la primera página
+    page_key = (status_param, location_filter or None, search)
+    if st.session_state.get("equipment_filters") != page_key:
+        st.session_state.equipment_filters = page_key
+        st.session_state.equipment_cursor = None
+    cursor = st.session_state.get("equipment_cursor")
+    if len(search) >= 2:
+        page = search_equipment(search, status_param, location_filter or None, cursor)
+    else:
+        page = fetch_equipment(status_param, location_filter or None, cursor)
+    equipment = page["items"]
 
     if equipment:
         df = pd.DataFrame(equipment)
         st.subheader("📦 Inventario de TI")
         st.dataframe(df[["asset_tag", "name", "type", "location", "status", "purchase_date", "supplier_id"]])
+        pager = st.columns([1, 2, 1])
+        if pager[0].button("⬅️ Anterior", disabled=not page.get("prev_cursor"), use_container_width=True):
+            st.session_state.equipment_cursor = page["prev_cursor"]
+            st.rerun()
+        if "total_estimate" in page:
+            pager[1].caption(f"{len(equipment)} equipos en esta página · ~{page['total_estimate']} en total")
+        else:
+            pager[1].caption(f"{len(equipment)} resultados, por relevancia")
+        if pager[2].button("Siguiente ➡️", disabled=not page.get("next_cursor"), use_container_width=True):
+            st.session_state.equipment_cursor = page["next_cursor"]
+            st.rerun()
     else:
         st.info("📭 No hay equipos registrados para los filtros seleccionados.")
 
-    tabs = st.tabs(["➕ Registrar equipo", "✏️ Actualizar equipo", "📋 Movimientos / Historial"])
+    tabs = st.tabs(["➕ Registrar equipo", "✏️ Actualizar equipo", "📋 Movimientos / Historial", "📦 Carga y traslados masivos"])
 
     with tabs[0]:
         suppliers = fetch_suppliers()
@@ -394,7 +489,7 @@ def render_equipment():
                 try:
                     api_json("POST", "/equipment", json=payload)
                     st.success("✅ Equipo registrado correctamente!")
-                    refresh_view(fetch_equipment, fetch_dashboard)
+                    refresh_view(fetch_equipment, search_equipment, fetch_maintenance_page, fetch_dashboard)
                 except requests.HTTPError as exc:
                     st.error(f"❌ Error: {exc.response.text}")
 
@@ -426,7 +521,58 @@ def render_equipment():
                     try:
                         api_json("PUT", f"/equipment/{selected['id']}", json=payload)
                         st.success("✅ Equipo actualizado!")
-                        refresh_view(fetch_equipment, fetch_dashboard)
+                        refresh_view(fetch_equipment, search_equipment, fetch_maintenance_page, fetch_dashboard)
+                    except requests.HTTPError as exc:
+                        st.error(f"❌ Error: {exc.response.text}")
+
+    with tabs[3]:
+        st.write("📥 Carga masiva desde CSV (con encabezado) o JSON Lines")
+        upload = st.file_uploader("Archivo de inventario", type=["csv", "jsonl", "ndjson"])
+        conflict_labels = {
+            "Omitir existentes": "skip",
+            "Actualizar existentes": "update",
+            "Cancelar si alguno existe": "fail",
+        }
+        conflict = st.selectbox("🔁 Si el asset tag ya existe", list(conflict_labels))
+        if upload and st.button("📥 Importar", use_container_width=True):
+            is_csv = upload.name.lower().endswith(".csv")
+            try:
+                result = api_json(
+                    "POST",
+                    "/equipment/import",
+                    params={"format": "csv" if is_csv else "ndjson", "on_conflict": conflict_labels[conflict]},
+                    data=upload.getvalue(),
+                    headers={"Content-Type": "text/csv" if is_csv else "application/x-ndjson"},
+                )
+                st.success(
+                    f"✅ {result['inserted']} nuevos, {result['updated']} actualizados, "
+                    f"{result['skipped']} omitidos, {result['failed']} con error"
+                )
+                if result["errors"]:
+                    st.dataframe(pd.DataFrame(result["errors"]))
+                invalidate_caches(fetch_equipment, search_equipment, fetch_maintenance_page, fetch_dashboard)
+            except requests.HTTPError as exc:
+                st.error(f"❌ Error: {exc.response.text}")
+
+        with st.form("bulk_movement"):
+            st.write("🚚 Traslado masivo: mueve todos los equipos de una ubicación")
+            payload = {
+                "from_location": st.text_input("📍 Ubicación de origen"),
+                "to_location": st.text_input("📍 Ubicación de destino"),
+                "assigned_to": st.text_input("👤 Asignado a") or None,
+                "notes": st.text_area("📝 Notas del traslado") or None,
+            }
+            if st.form_submit_button("🚚 Trasladar", use_container_width=True):
+                if not payload["from_location"] or not payload["to_location"]:
+                    st.warning("⚠️ Indica la ubicación de origen y la de destino.")
+                else:
+                    try:
+                        summary = api_json("POST", "/equipment/movements/bulk", json=payload)
+                        st.success(
+                            f"✅ {summary['moved']} equipos trasladados a {summary['to_location']} "
+                            f"({summary['unchanged']} ya estaban allí)"
+                        )
+                        refresh_view(fetch_equipment, search_equipment, fetch_maintenance_page, fetch_dashboard)
                     except requests.HTTPError as exc:
                         st.error(f"❌ Error: {exc.response.text}")
 
@@ -437,11 +583,25 @@ def render_equipment():
         equipment_options = {f"{item['asset_tag']}": item for item in equipment}
         selected_label = st.selectbox("🔍 Equipo para revisar historial", list(equipment_options.keys()), key="history_selector")
         selected = equipment_options[selected_label]
-        history = api_json("GET", f"/equipment/{selected['id']}/history")
+        if st.session_state.get("history_equipment") != selected["id"]:
+            st.session_state.history_equipment = selected["id"]
+            st.session_state.history_cursor = None
+        params = {"limit": 50}
+        if st.session_state.get("history_cursor"):
+            params["cursor"] = st.session_state.history_cursor
+        page = api_json("GET", f"/equipment/{selected['id']}/history", params=params)
+        history = page["items"]
         st.subheader("📋 Historial de movimientos")
         if history:
             hist_df = pd.DataFrame(history)
             st.dataframe(hist_df[["from_location", "to_location", "assigned_to", "notes", "moved_at"]])
+            pager = st.columns(2)
+            if pager[0].button("⬅️ Más recientes", disabled=not page.get("prev_cursor"), use_container_width=True):
+                st.session_state.history_cursor = page["prev_cursor"]
+                st.rerun()
+            if pager[1].button("Más antiguos ➡️", disabled=not page.get("next_cursor"), use_container_width=True):
+                st.session_state.history_cursor = page["next_cursor"]
+                st.rerun()
         else:
             st.info("📭 Aún no hay movimientos registrados.")
 
@@ -458,17 +618,39 @@ def render_equipment():
                 try:
                     api_json("POST", f"/equipment/{selected['id']}/movements", json=payload)
                     st.success("✅ Movimiento registrado!")
-                    refresh_view(fetch_equipment)
+                    refresh_view(fetch_equipment, search_equipment, fetch_maintenance_page)
                 except requests.HTTPError as exc:
                     st.error(f"❌ Error: {exc.response.text}")
 
+def render_pager(cursor_key: str, page: dict, label: str):
+    """Botones Anterior/Siguiente de una página por cursor; el cursor vive en ``session_state``."""
+    pager = st.columns([1, 2, 1])
+    if pager[0].button("⬅️ Anterior", key=f"{cursor_key}_prev", disabled=not page.get("prev_cursor"), use_container_width=True):
+        st.session_state[cursor_key] = page["prev_cursor"]
+        st.rerun()
+    pager[1].caption(f"{len(page['items'])} {label} en esta página · ~{page['total_estimate']} en total")
+    if pager[2].button("Siguiente ➡️", key=f"{cursor_key}_next", disabled=not page.get("next_cursor"), use_container_width=True):
+        st.session_state[cursor_key] = page["next_cursor"]
+        st.rerun()
+
 def render_maintenance():
     st.header("🔧 Gestión de Mantenimiento")
-    tasks = fetch_tasks()
-    logs = fetch_logs()
-
-    equipment = fetch_equipment()
-    equipment_map = {str(item["id"]): (item.get("name") or item.get("asset_tag") or str(item["id"])) for item in (equipment or [])}
+    filters = st.columns(2)
+    status_filter = filters[0].selectbox("🔍 Filtrar por estado", ["Todos", "scheduled", "completed"])
+    team_filter = filters[1].text_input("🔍 Filtrar por equipo responsable").strip()
+    status_param = None if status_filter == "Todos" else status_filter
+    # Al cambiar los filtros se vuelve a la primera página de tareas
+    page_key = (status_param, team_filter or None)
+    if st.session_state.get("tasks_filters") != page_key:
+        st.session_state.tasks_filters = page_key
+        st.session_state.tasks_cursor = None
+    task_page, log_page, pending_tasks = fetch_maintenance_page(
+        status_param,
+        team_filter or None,
+        st.session_state.get("tasks_cursor"),
+        st.session_state.get("logs_cursor"),
+    )
+    tasks, logs = task_page["items"], log_page["items"]
 
     tabs = st.tabs([
         "📅 Calendario / Programar",
@@ -482,18 +664,20 @@ def render_maintenance():
             st.info("📭 Sin tareas registradas.")
         else:
             scheduled["scheduled_for"] = pd.to_datetime(scheduled["scheduled_for"])
-            scheduled["equipo"] = (
-                scheduled["equipment_id"].astype(str).map(equipment_map).fillna(scheduled["equipment_id"])
-            )
+            scheduled["equipo"] = equipment_label(scheduled)
             st.dataframe(scheduled[["scheduled_for", "equipo", "type", "priority", "status", "assigned_team"]])
+            render_pager("tasks_cursor", task_page, "tareas")
 
         st.markdown("---")
         st.subheader("🗓️ Programar mantenimiento")
-        equipment = fetch_equipment()
+        # Se elige entre los resultados de una búsqueda (o los equipos más
+        # recientes) en lugar de descargar todo el inventario.
+        query = st.text_input("🔎 Buscar equipo por asset tag, nombre o ubicación", key="schedule_search").strip()
+        equipment = (search_equipment(query) if len(query) >= 2 else fetch_equipment())["items"]
         if not equipment:
-            st.warning("⚠️ Registra equipos antes de programar mantenimiento.")
+            st.warning("⚠️ No hay equipos que coincidan; registra equipos o ajusta la búsqueda.")
         else:
-            options = {f"{item['asset_tag']}": item for item in equipment}
+            options = {f"{item['asset_tag']} - {item.get('name') or ''}": item for item in equipment}
             with st.form("schedule_task"):
                 selected = st.selectbox("💻 Equipo", list(options.keys()))
                 payload = {
@@ -507,7 +691,7 @@ def render_maintenance():
                     try:
                         api_json("POST", "/maintenance/tasks", json=payload)
                         st.success("✅ Tarea programada!")
-                        refresh_view(fetch_tasks, fetch_upcoming_tasks, fetch_dashboard)
+                        refresh_view(fetch_maintenance_page, fetch_upcoming_tasks, fetch_dashboard)
                     except requests.HTTPError as exc:
                         st.error(f"❌ Error: {exc.response.text}")
 
@@ -518,20 +702,15 @@ def render_maintenance():
             st.info("📭 Aún no hay bitácoras de mantenimiento.")
         else:
             st.dataframe(log_df[["completed_on", "action_taken", "cost", "notes"]])
+            render_pager("logs_cursor", log_page, "bitácoras")
 
         st.markdown("---")
         st.subheader("📝 Registrar reparación")
-        if not tasks:
-            st.warning("⚠️ No hay tareas para registrar reparaciones.")
-            return
-        pending_tasks = [
-            t for t in tasks if str(t.get("status", "")).lower() not in ("completed", "completado", "done")
-        ]
         if not pending_tasks:
             st.info("📭 No hay tareas pendientes para registrar reparaciones.")
             return
         pending_map = {
-            f"{t['scheduled_for']} - {equipment_map.get(str(t['equipment_id']), t['equipment_id'])} ({t['type']})": t
+            f"{t['scheduled_for']} - {t.get('asset_tag') or t['equipment_id']} ({t['type']})": t
             for t in pending_tasks
         }
         with st.form("register_log"):
@@ -548,13 +727,13 @@ def render_maintenance():
                 try:
                     api_json("POST", "/maintenance/logs", json=payload)
                     st.success("✅ Bitácora registrada y tarea marcada como completada!")
-                    refresh_view(fetch_tasks, fetch_logs, fetch_dashboard)
+                    refresh_view(fetch_maintenance_page, fetch_dashboard)
                 except requests.HTTPError as exc:
                     st.error(f"❌ Error: {exc.response.text}")
 
 def render_reports():
     st.header("📊 Análisis y Reportes")
-    metrics = fetch_dashboard()["metrics"]
+    metrics = dashboard_metrics(fetch_dashboard())
     st.subheader("📈 Métricas clave")
     col1, col2, col3 = st.columns(3)
     col1.metric("✅ Equipos operativos", metrics["equipment_by_status"].get("operational", 0))
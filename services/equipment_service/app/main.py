@@ -1,12 +1,41 @@
-from typing import List
+import asyncio
+import codecs
+import csv
+import io
+import json
+import logging
+import os
+import re
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, Iterator, Literal
 from uuid import UUID
 
-from fastapi import Depends, FastAPI, HTTPException, Query
-from sqlalchemy import func
+import anyio
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy import func, literal, select, text, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from common import models, schemas
-from common.database import get_session
+from common import jobs, models, schemas, utils
+from common.database import get_read_session, get_session, prefers_primary, read_session_scope, session_scope
+
+
+logger = logging.getLogger("equipment-service")
+
+# Segundos entre consolidaciones de equipment_counter_deltas en equipment_counters
+COUNTERS_ROLLUP_INTERVAL = int(os.getenv("COUNTERS_ROLLUP_INTERVAL", "60"))
+# Segundos entre reconciliaciones de los contadores con la tabla equipment
+COUNTERS_RECONCILE_INTERVAL = int(os.getenv("COUNTERS_RECONCILE_INTERVAL", "3600"))
+# Filas por sentencia INSERT multi-fila de la importación masiva (13 parámetros
+# por fila: mantenerlo por debajo del límite de parámetros del driver).
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+# Filas que la exportación completa trae del cursor de servidor en cada lectura
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
 
 
 app = FastAPI(
@@ -16,38 +45,406 @@ app = FastAPI(
 )
 
 
+# Columnas de orden admitidas por el listado; el id desempata para que el
+# orden sea estable y el cursor apunte a una fila concreta.
+EQUIPMENT_SORTS = {
+    "created_at": models.Equipment.created_at,
+    "asset_tag": models.Equipment.asset_tag,
+}
+
+
+# Documento de búsqueda: debe coincidir literalmente con la expresión de los
+# índices GIN de db/schema.sql para que el planificador los use.
+SEARCH_DOCUMENT = (
+    "lower(coalesce(asset_tag, '') || ' ' || coalesce(name, '') || ' ' || coalesce(model, '')"
+    " || ' ' || coalesce(serial_number, '') || ' ' || coalesce(location, ''))"
+)
+SEARCH_VECTOR = f"to_tsvector('simple', {SEARCH_DOCUMENT})"
+
+
+# Columnas de /equipment/export, en el orden del encabezado CSV.
+EXPORT_COLUMNS = (
+    models.Equipment.id,
+    models.Equipment.asset_tag,
+    models.Equipment.name,
+    models.Equipment.type,
+    models.Equipment.model,
+    models.Equipment.serial_number,
+    models.Equipment.purchase_date,
+    models.Equipment.cost,
+    models.Equipment.location,
+    models.Equipment.status,
+    models.Equipment.useful_life_years,
+    models.Equipment.supplier_id,
+    models.Supplier.name.label("supplier_name"),
+    models.Equipment.created_at,
+    models.Equipment.updated_at,
+)
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
 @app.post("/equipment", response_model=schemas.EquipmentOut, status_code=201)
 def create_equipment(
     payload: schemas.EquipmentCreate, db: Session = Depends(get_session)
 ):
-    exists = (
-        db.query(models.Equipment)
-        .filter(models.Equipment.asset_tag == payload.asset_tag)
-        .first()
+    # Una sola sentencia: el conflicto de asset_tag lo resuelve la BD, sin
+    # carrera entre comprobar y escribir.
+    statement = (
+        insert(models.Equipment)
+        .values(**payload.dict())
+        .on_conflict_do_nothing(index_elements=[models.Equipment.asset_tag])
+        .returning(models.Equipment)
     )
-    if exists:
+    try:
+        equipment = db.scalars(statement).one_or_none()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Proveedor no encontrado")
+    if equipment is None:
         raise HTTPException(status_code=409, detail="Asset tag ya registrado")
-
-    equipment = models.Equipment(**payload.dict())
-    db.add(equipment)
+    # Se serializa antes del commit para no recargar la fila expirada
+    created = schemas.EquipmentOut.from_orm(equipment)
     db.commit()
-    db.refresh(equipment)
-    return equipment
+    return created
+
+
+class ImportAborted(Exception):
+    """Conflicto de ``asset_tag`` con la política ``fail``: se descarta toda la importación."""
+
+
+def _body_lines(read_chunk: Callable[[], bytes | None]) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    while (chunk := read_chunk()) is not None:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line + "\n"
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+
+def _import_rows(lines: Iterator[str], fmt: str) -> Iterator[tuple]:
+    """Genera ``(número de fila, dict | mensaje de error)`` a partir del cuerpo."""
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(lines), start=1):
+            yield number, {key.strip(): (value.strip() or None) for key, value in row.items() if key and isinstance(value, str)}
+        return
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield number, f"JSON inválido: {exc}"
+            continue
+        yield number, row if isinstance(row, dict) else "Se esperaba un objeto JSON"
+
+
+def _row_error(report: dict, number: int, asset_tag: str | None, error: str) -> None:
+    report["failed"] += 1
+    report["errors"].append({"row": number, "asset_tag": asset_tag, "error": error})
+
+
+def _load_chunk(db: Session, chunk: list, on_conflict: str, report: dict) -> None:
+    supplier_ids = {values["supplier_id"] for _, values in chunk if values.get("supplier_id")}
+    known_suppliers = set()
+    if supplier_ids:
+        known_suppliers = {
+            supplier_id for (supplier_id,) in db.query(models.Supplier.id).filter(models.Supplier.id.in_(supplier_ids))
+        }
+
+    pending = {}
+    for number, values in chunk:
+        tag = values["asset_tag"]
+        if values.get("supplier_id") and values["supplier_id"] not in known_suppliers:
+            _row_error(report, number, tag, "Proveedor no encontrado")
+        elif tag not in pending:
+            pending[tag] = (number, values)
+        elif on_conflict == "skip":
+            report["skipped"] += 1
+        elif on_conflict == "update":
+            pending[tag] = (number, values)
+            report["updated"] += 1
+        else:
+            _row_error(report, number, tag, "Asset tag repetido en el archivo")
+            raise ImportAborted(report["errors"])
+    if not pending:
+        return
+
+    existing = {
+        tag for (tag,) in db.query(models.Equipment.asset_tag).filter(models.Equipment.asset_tag.in_(pending))
+    }
+    if existing and on_conflict == "fail":
+        for tag in sorted(existing, key=lambda tag: pending[tag][0]):
+            _row_error(report, pending[tag][0], tag, "Asset tag ya registrado")
+        raise ImportAborted(report["errors"])
+
+    # Sentencia fija ejecutada como executemany: SQLAlchemy la agrupa en INSERT
+    # multi-fila ("insertmanyvalues") sin recompilarla en cada bloque.
+    statement = insert(models.Equipment.__table__)
+    if on_conflict == "update":
+        columns = [column for column in schemas.EquipmentCreate.__fields__ if column != "asset_tag"]
+        statement = statement.on_conflict_do_update(
+            index_elements=[models.Equipment.asset_tag],
+            set_={**{column: statement.excluded[column] for column in columns}, "updated_at": datetime.utcnow()},
+        )
+    else:
+        statement = statement.on_conflict_do_nothing(index_elements=[models.Equipment.asset_tag])
+    rows = [values for _, values in pending.values()]
+    written = set(db.execute(statement.returning(models.Equipment.asset_tag), rows).scalars())
+
+    if on_conflict == "update":
+        report["updated"] += len(existing)
+        report["inserted"] += len(written) - len(existing)
+        return
+    report["inserted"] += len(written)
+    conflicts = set(pending) - written
+    if conflicts and on_conflict == "fail":
+        # Alta concurrente entre la comprobación y el INSERT
+        for tag in conflicts:
+            _row_error(report, pending[tag][0], tag, "Asset tag ya registrado")
+        raise ImportAborted(report["errors"])
+    report["skipped"] += len(conflicts)
+
 
+def _import_equipment(read_chunk: Callable[[], bytes | None], fmt: str, on_conflict: str) -> dict:
+    report = {"received": 0, "inserted": 0, "updated": 0, "skipped": 0, "failed": 0, "errors": []}
+    started = time.perf_counter()
+    with session_scope() as db:
+        chunk = []
+        for number, row in _import_rows(_body_lines(read_chunk), fmt):
+            report["received"] += 1
+            if isinstance(row, str):
+                _row_error(report, number, None, row)
+                continue
+            try:
+                values = schemas.EquipmentCreate(**row).dict()
+            except (ValidationError, TypeError) as exc:
+                errors = exc.errors() if isinstance(exc, ValidationError) else [{"loc": (), "msg": str(exc)}]
+                message = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in errors)
+                _row_error(report, number, row.get("asset_tag"), message)
+                continue
+            chunk.append((number, values))
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                _load_chunk(db, chunk, on_conflict, report)
+                chunk = []
+        if chunk:
+            _load_chunk(db, chunk, on_conflict, report)
+    elapsed = time.perf_counter() - started
+    report["elapsed_seconds"] = round(elapsed, 3)
+    report["rows_per_second"] = round(report["received"] / elapsed, 1) if elapsed else 0.0
+    return report
 
-@app.get("/equipment", response_model=List[schemas.EquipmentOut])
+
+@app.post("/equipment/import", response_model=schemas.EquipmentImportReport)
+async def import_equipment(
+    request: Request,
+    format: Literal["csv", "ndjson"] | None = None,
+    on_conflict: Literal["skip", "update", "fail"] = "skip",
+):
+    """Importación masiva desde CSV (con encabezado) o JSON Lines.
+
+    El cuerpo se lee en streaming y se valida y escribe por bloques en una
+    única transacción. Las filas inválidas se informan sin detener la carga;
+    con ``on_conflict=fail`` un ``asset_tag`` existente descarta todo (409).
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+    stream = request.stream()
+
+    async def next_chunk() -> bytes | None:
+        try:
+            return await stream.__anext__()
+        except StopAsyncIteration:
+            return None
+
+    def read_chunk() -> bytes | None:
+        return anyio.from_thread.run(next_chunk)
+
+    try:
+        return await anyio.to_thread.run_sync(_import_equipment, read_chunk, format, on_conflict)
+    except ImportAborted as exc:
+        raise HTTPException(
+            status_code=409,
+            detail={"message": "Importación cancelada por asset_tag duplicado", "errors": exc.args[0]},
+        ) from exc
+
+
+@app.get("/equipment", response_model=schemas.EquipmentPage)
 def list_equipment(
-    db: Session = Depends(get_session),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_session),
     status: str | None = None,
     location: str | None = None,
-    limit: int = Query(50, le=200),
+    sort: Literal["created_at", "asset_tag"] = "created_at",
+    order: Literal["asc", "desc"] = "asc",
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
 ):
+    etag = utils.table_etag(db, models.Equipment)
+    if utils.etag_matches(request, etag):
+        return utils.not_modified(etag)
+    response.headers["ETag"] = etag
+    position = utils.decode_cursor(cursor) if cursor else None
+    if position:
+        # El cursor manda sobre sort/order para no mezclar órdenes entre páginas
+        sort = utils.cursor_option(position, "sort", sort, EQUIPMENT_SORTS)
+        order = utils.cursor_option(position, "order", order, ("asc", "desc"))
     query = db.query(models.Equipment)
     if status:
         query = query.filter(models.Equipment.status == status)
     if location:
         query = query.filter(models.Equipment.location == location)
-    return query.limit(limit).all()
+    page = utils.keyset_page(
+        query,
+        [EQUIPMENT_SORTS[sort], models.Equipment.id],
+        limit,
+        position,
+        descending=order == "desc",
+        sort=sort,
+        order=order,
+    )
+    page["total_estimate"] = utils.estimate_count(db, query)
+    return page
+
+
+@app.get("/equipment/search", response_model=schemas.EquipmentSearchPage)
+def search_equipment(
+    db: Session = Depends(get_read_session),
+    q: str = Query(..., min_length=2, max_length=100),
+    status: str | None = None,
+    location: str | None = None,
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Búsqueda por prefijo de asset tag, texto completo y similitud (trigramas).
+
+    El orden es por relevancia: coincidencia de prefijo en ``asset_tag``, más
+    ``ts_rank`` de las palabras buscadas como prefijos, más la similitud de
+    trigramas, que tolera errores de escritura.
+    """
+    term = q.strip().lower()
+    words = re.findall(r"[^\W_]+", term)
+    params = {
+        "q": term,
+        "prefix": term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%",
+        "tsquery": " & ".join(f"{word}:*" for word in words) or "''",
+        "limit": limit + 1,
+    }
+    filters = ""
+    if status:
+        filters += " AND status = :status"
+        params["status"] = status
+    if location:
+        filters += " AND location = :location"
+        params["location"] = location
+    after = ""
+    if cursor:
+        position = utils.decode_cursor(cursor)
+        try:
+            params["after_rank"], params["after_id"] = float(position["k"][0]), str(UUID(position["k"][1]))
+        except (AttributeError, IndexError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+        after = "WHERE (rank, id) < (:after_rank, CAST(:after_id AS uuid))"
+    statement = text(f"""
+        SELECT id, rank FROM (
+            SELECT id,
+                CAST(
+                    CASE WHEN lower(asset_tag) LIKE :prefix THEN 1 ELSE 0 END
+                    + ts_rank({SEARCH_VECTOR}, to_tsquery('simple', :tsquery))
+                    + word_similarity(:q, {SEARCH_DOCUMENT})
+                AS double precision) AS rank
+            FROM equipment
+            WHERE (
+                lower(asset_tag) LIKE :prefix
+                OR {SEARCH_VECTOR} @@ to_tsquery('simple', :tsquery)
+                OR :q <% {SEARCH_DOCUMENT}
+            ){filters}
+        ) ranked
+        {after}
+        ORDER BY rank DESC, id DESC
+        LIMIT :limit
+    """)
+    hits = db.execute(statement, params).all()
+    more = len(hits) > limit
+    hits = hits[:limit]
+    ranks = {row.id: row.rank for row in hits}
+    equipment = {
+        item.id: item
+        for item in db.query(models.Equipment).filter(models.Equipment.id.in_(ranks))
+    }
+    items = [
+        {**schemas.EquipmentOut.from_orm(equipment[row.id]).dict(), "rank": round(row.rank, 4)}
+        for row in hits
+        if row.id in equipment
+    ]
+    next_cursor = utils.encode_cursor({"k": [hits[-1].rank, hits[-1].id]}) if more else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def _export_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} no serializable")
+
+
+def _export_chunks(fmt: str, status: str | None, location: str | None, primary: bool = False) -> Iterator[str]:
+    """Genera la exportación por bloques de ``EXPORT_BATCH_SIZE`` filas.
+
+    La sesión se abre aquí y no como dependencia porque debe vivir mientras
+    dura la respuesta. Con ``yield_per`` PostgreSQL entrega las filas desde un
+    cursor de servidor, así que la memoria no depende del tamaño de la tabla.
+    """
+    query = (
+        select(*EXPORT_COLUMNS)
+        .outerjoin(models.Supplier, models.Supplier.id == models.Equipment.supplier_id)
+        .order_by(models.Equipment.created_at, models.Equipment.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+    if status:
+        query = query.where(models.Equipment.status == status)
+    if location:
+        query = query.where(models.Equipment.location == location)
+    with read_session_scope(primary=primary) as db:
+        result = db.execute(query)
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(column.key for column in EXPORT_COLUMNS)
+            for rows in result.partitions():
+                writer.writerows(rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            for rows in result.partitions():
+                yield "".join(json.dumps(row._asdict(), default=_export_default) + "\n" for row in rows)
+
+
+@app.get("/equipment/export")
+def export_equipment(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status: str | None = None,
+    location: str | None = None,
+):
+    """Inventario completo con el nombre del proveedor, en NDJSON o CSV."""
+    filename = f"equipment_{datetime.utcnow():%Y%m%dT%H%M%S}.{format}"
+    return StreamingResponse(
+        _export_chunks(format, status, location, primary=prefers_primary(request)),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
 
 
 @app.get("/equipment/{equipment_id}", response_model=schemas.EquipmentOut)
@@ -64,15 +461,77 @@ def update_equipment(
     payload: schemas.EquipmentUpdate,
     db: Session = Depends(get_session),
 ):
-    equipment = db.get(models.Equipment, equipment_id)
-    if not equipment:
+    statement = (
+        update(models.Equipment)
+        .where(models.Equipment.id == equipment_id)
+        .values(**payload.dict(exclude_unset=True))
+        .returning(models.Equipment)
+    )
+    equipment = db.scalars(statement).one_or_none()
+    if equipment is None:
         raise HTTPException(status_code=404, detail="Equipo no encontrado")
+    updated = schemas.EquipmentOut.from_orm(equipment)
+    db.commit()
+    return updated
+
+
+@app.post("/equipment/movements/bulk", response_model=schemas.BulkMovementSummary)
+def bulk_movements(payload: schemas.BulkMovementCreate, db: Session = Depends(get_session)):
+    """Traslado masivo: mueve los equipos indicados (ids y/o ubicación de origen).
+
+    Una sola sentencia bloquea las filas, actualiza ``location`` y registra un
+    movimiento por equipo con su ubicación anterior. Los que ya están en el
+    destino no se tocan.
+    """
+    started = time.perf_counter()
+    equipment = models.Equipment
+    selection = []
+    not_found = []
+    if payload.equipment_ids:
+        requested = set(payload.equipment_ids)
+        found = {row_id for (row_id,) in db.query(equipment.id).filter(equipment.id.in_(requested))}
+        not_found = sorted(requested - found, key=str)
+        selection.append(equipment.id.in_(requested))
+    if payload.from_location:
+        selection.append(equipment.location == payload.from_location)
+    matched = db.query(func.count(equipment.id)).filter(*selection).scalar()
 
-    for key, value in payload.dict(exclude_unset=True).items():
-        setattr(equipment, key, value)
+    now = datetime.utcnow()
+    previous = (
+        select(equipment.id, equipment.location)
+        .where(*selection, equipment.location.is_distinct_from(payload.to_location))
+        .with_for_update()
+        .subquery("previous")
+    )
+    moved = (
+        update(equipment.__table__)
+        .where(equipment.id == previous.c.id)
+        .values(location=payload.to_location, updated_at=now)
+        .returning(equipment.id, previous.c.location)
+        .cte("moved")
+    )
+    movements = insert(models.EquipmentMovement.__table__).from_select(
+        ["id", "equipment_id", "from_location", "to_location", "assigned_to", "notes", "moved_at"],
+        select(
+            func.uuid_generate_v4(),
+            moved.c.id,
+            moved.c.location,
+            literal(payload.to_location),
+            literal(payload.assigned_to, models.EquipmentMovement.assigned_to.type),
+            literal(payload.notes, models.EquipmentMovement.notes.type),
+            literal(now),
+        ),
+    )
+    result = db.execute(movements)
     db.commit()
-    db.refresh(equipment)
-    return equipment
+    return {
+        "matched": matched,
+        "moved": result.rowcount,
+        "unchanged": max(0, matched - result.rowcount),
+        "not_found": not_found,
+        "to_location": payload.to_location,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
 
 
 @app.post(
@@ -85,46 +544,201 @@ def add_movement(
     payload: schemas.EquipmentMovementBase,
     db: Session = Depends(get_session),
 ):
-    equipment = db.get(models.Equipment, equipment_id)
-    if not equipment:
+    statement = (
+        insert(models.EquipmentMovement)
+        .values(**{**payload.dict(), "equipment_id": equipment_id})
+        .returning(models.EquipmentMovement)
+    )
+    try:
+        movement = db.scalars(statement).one()
+    except IntegrityError:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Equipo no encontrado")
-
-    movement = models.EquipmentMovement(**payload.dict())
-    db.add(movement)
+    created = schemas.EquipmentMovementOut.from_orm(movement)
     db.commit()
-    db.refresh(movement)
-    return movement
+    return created
 
 
-@app.get(
-    "/equipment/{equipment_id}/history",
-    response_model=List[schemas.EquipmentMovementOut],
-)
-def get_history(equipment_id: UUID, db: Session = Depends(get_session)):
-    equipment = db.get(models.Equipment, equipment_id)
-    if not equipment:
+@app.get("/equipment/{equipment_id}/history", response_model=schemas.MovementPage)
+def get_history(
+    equipment_id: UUID,
+    db: Session = Depends(get_read_session),
+    since: datetime | date | None = None,
+    until: datetime | date | None = None,
+    order: Literal["asc", "desc"] = "desc",
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    latest: int | None = Query(None, ge=1, le=500),
+):
+    """Movimientos del equipo por ``moved_at``, paginados por cursor.
+
+    ``since``/``until`` aceptan fecha y hora o sólo fecha; ``until`` con sólo
+    fecha incluye ese día completo. ``latest=N`` devuelve directamente los N
+    más recientes. Todas las variantes recorren el índice
+    ``(equipment_id, moved_at DESC, id DESC)``.
+    """
+    movement = models.EquipmentMovement
+    query = db.query(movement).filter(movement.equipment_id == equipment_id)
+    if since:
+        if not isinstance(since, datetime):
+            since = datetime.combine(since, datetime.min.time())
+        query = query.filter(movement.moved_at >= since)
+    if until:
+        if not isinstance(until, datetime):
+            until = datetime.combine(until + timedelta(days=1), datetime.min.time())
+        query = query.filter(movement.moved_at < until)
+    if latest:
+        items = query.order_by(movement.moved_at.desc(), movement.id.desc()).limit(latest).all()
+        page = {"items": items, "next_cursor": None, "prev_cursor": None}
+    else:
+        position = utils.decode_cursor(cursor) if cursor else None
+        order = utils.cursor_option(position, "order", order, ("asc", "desc"))
+        page = utils.keyset_page(
+            query, [movement.moved_at, movement.id], limit, position, descending=order == "desc", order=order
+        )
+    # La existencia del equipo sólo se comprueba cuando no hay movimientos
+    if not page["items"] and not db.get(models.Equipment, equipment_id):
         raise HTTPException(status_code=404, detail="Equipo no encontrado")
-    return equipment.movements
+    return page
 
 
-@app.get("/metrics/inventory")
-def inventory_metrics(db: Session = Depends(get_session)):
-    total = db.query(models.Equipment).count()
-    by_status = (
-        db.query(models.Equipment.status, func.count(models.Equipment.id))
-        .group_by(models.Equipment.status)
-        .all()
+# Contadores consolidados más los deltas pendientes, en una sola lectura
+INVENTORY_COUNTERS = text("""
+    SELECT dimension, value, sum(count) AS count
+    FROM (
+        SELECT dimension, value, count FROM equipment_counters
+        UNION ALL
+        SELECT dimension, value, delta FROM equipment_counter_deltas
+    ) AS counters
+    GROUP BY dimension, value
+    HAVING sum(count) > 0
+""")
+
+# Mueve los deltas a equipment_counters. El ORDER BY fija el orden en que se
+# bloquean las filas de contadores; sólo esta sentencia las escribe.
+COUNTERS_ROLLUP = text("""
+    WITH moved AS (
+        DELETE FROM equipment_counter_deltas RETURNING dimension, value, delta
     )
-    by_location = (
-        db.query(models.Equipment.location, func.count(models.Equipment.id))
-        .group_by(models.Equipment.location)
-        .all()
+    INSERT INTO equipment_counters (dimension, value, count)
+    SELECT dimension, value, sum(delta) FROM moved
+    GROUP BY dimension, value
+    ORDER BY dimension, value
+    ON CONFLICT (dimension, value) DO UPDATE SET count = equipment_counters.count + EXCLUDED.count
+""")
+
+# Compara equipment con contadores y deltas, y registra la diferencia como un
+# delta más. Al ser una sola sentencia todo se lee de la misma instantánea: no
+# hace falta bloquear y las escrituras concurrentes siguen su curso.
+COUNTERS_RECONCILE = text("""
+    WITH actual AS (
+        SELECT 'status' AS dimension, coalesce(status, '') AS value, count(*) AS count
+        FROM equipment GROUP BY 2
+        UNION ALL
+        SELECT 'location', coalesce(location, ''), count(*)
+        FROM equipment GROUP BY 2
+    ),
+    stored AS (
+        SELECT dimension, value, sum(count) AS count
+        FROM (
+            SELECT dimension, value, count FROM equipment_counters
+            UNION ALL
+            SELECT dimension, value, delta FROM equipment_counter_deltas
+        ) AS counters
+        GROUP BY dimension, value
     )
-    return {
-        "total": total,
-        "by_status": {status or "Sin definir": count for status, count in by_status},
-        "by_location": {
-            location or "Sin definir": count for location, count in by_location
-        },
+    INSERT INTO equipment_counter_deltas (dimension, value, delta)
+    SELECT coalesce(a.dimension, s.dimension), coalesce(a.value, s.value),
+           coalesce(a.count, 0) - coalesce(s.count, 0)
+    FROM actual AS a
+    FULL JOIN stored AS s ON s.dimension = a.dimension AND s.value = a.value
+    WHERE coalesce(a.count, 0) <> coalesce(s.count, 0)
+    RETURNING dimension, value, delta
+""")
+
+
+@app.get("/metrics/inventory")
+def inventory_metrics(
+    request: Request, response: Response, db: Session = Depends(get_read_session)
+):
+    # Lee los contadores mantenidos por triggers: una fila por grupo, sin
+    # recorrer equipment.
+    counters = db.execute(INVENTORY_COUNTERS).all()
+    by_status = {c.value or "Sin definir": c.count for c in counters if c.dimension == "status"}
+    by_location = {c.value or "Sin definir": c.count for c in counters if c.dimension == "location"}
+    metrics = {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "by_location": by_location,
     }
+    etag = utils.content_etag(metrics)
+    if utils.etag_matches(request, etag):
+        return utils.not_modified(etag)
+    response.headers["ETag"] = etag
+    return metrics
+
+
+def rollup_counters(db: Session) -> int:
+    """Consolida los deltas pendientes; varias réplicas pueden hacerlo a la vez."""
+    return db.execute(COUNTERS_ROLLUP).rowcount
+
+
+def reconcile_counters(db: Session) -> dict:
+    """Corrige los contadores según ``equipment`` y devuelve lo corregido."""
+    return {f"{row.dimension}:{row.value}": row.delta for row in db.execute(COUNTERS_RECONCILE)}
+
+
+def _reconcile_job() -> int:
+    with session_scope() as db:
+        drift = reconcile_counters(db)
+    if drift:
+        logger.warning("Contadores de inventario corregidos: %s", drift)
+    return len(drift)
+
+
+# Una sola réplica reconcilia cada horario (ver common/jobs.py)
+COUNTERS_RECONCILE_JOB = jobs.Job(
+    "equipment-counters-reconcile",
+    _reconcile_job,
+    jobs.every(max(COUNTERS_RECONCILE_INTERVAL, 1) / 3600),
+)
+
+
+def _counters_tick() -> None:
+    with session_scope() as db:
+        rollup_counters(db)
+    if COUNTERS_RECONCILE_INTERVAL > 0:
+        jobs.run_due([COUNTERS_RECONCILE_JOB])
+
+
+async def _counters_loop() -> None:
+    while True:
+        try:
+            await anyio.to_thread.run_sync(_counters_tick)
+        except Exception:
+            logger.exception("No se pudieron consolidar los contadores de inventario")
+        await asyncio.sleep(COUNTERS_ROLLUP_INTERVAL)
+
+
+_background_tasks: Dict[str, "asyncio.Task[None]"] = {}
+
+
+@app.on_event("startup")
+async def on_startup():
+    if COUNTERS_ROLLUP_INTERVAL > 0:
+        _background_tasks["counters"] = asyncio.create_task(_counters_loop())
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    for task in _background_tasks.values():
+        task.cancel()
+    _background_tasks.clear()
+
+
+@app.post("/metrics/inventory/reconcile")
+def reconcile_inventory_metrics(db: Session = Depends(get_session)):
+    drift = reconcile_counters(db)
+    db.commit()
+    return {"corrected": drift}
 
@@ -1,70 +1,327 @@
+import json
 import logging
 import os
-from datetime import date, timedelta
-from typing import List
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Literal
 from uuid import UUID
 
 from apscheduler.schedulers.background import BackgroundScheduler
-from fastapi import Depends, FastAPI, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+from sqlalchemy import and_, bindparam, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload
 
-from common import models, schemas
-from common.database import SessionLocal, get_session, session_scope
+from common import jobs, models, notifications, schemas, utils
+from common.database import SessionLocal, get_read_session, get_session, session_scope
 
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("maintenance-service")
 
 REMINDER_DAYS = int(os.getenv("REMINDER_DAYS", "7"))
+# Destinos de los recordatorios, separados por comas: smtp, webhook, file
+REMINDER_SINKS = os.getenv("REMINDER_SINKS", "file")
+# Entregas simultáneas y tareas tomadas por ejecución
+REMINDER_CONCURRENCY = int(os.getenv("REMINDER_CONCURRENCY", "4"))
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", "5000"))
+REMINDER_MAX_ATTEMPTS = int(os.getenv("REMINDER_MAX_ATTEMPTS", "5"))
+# Segundos que una ejecución se reserva las entregas que está enviando
+REMINDER_SEND_LEASE = int(os.getenv("REMINDER_SEND_LEASE", "600"))
+UNASSIGNED_TEAM = "sin-asignar"
 OBSOLETE_YEARS = int(os.getenv("OBSOLETE_YEARS", "5"))
+# Equipos por transacción del trabajo de obsolescencia
+OBSOLESCENCE_CHUNK_SIZE = int(os.getenv("OBSOLESCENCE_CHUNK_SIZE", "1000"))
+# Segundos entre revisiones de los horarios de los trabajos programados
+JOB_CHECK_INTERVAL = int(os.getenv("JOB_CHECK_INTERVAL", "60"))
+# "false" deja los trabajos al worker (python -m app.worker) y la API sólo atiende peticiones
+RUN_SCHEDULER = os.getenv("RUN_SCHEDULER", "true").lower() in ("1", "true", "yes")
 
 scheduler = BackgroundScheduler(timezone="UTC")
 
 
-def remind_maintenance():
+@lru_cache(maxsize=1)
+def reminder_sinks() -> Dict[str, object]:
+    return notifications.build_sinks(REMINDER_SINKS)
+
+
+def _digest(team: str, tasks: list, equipment: dict) -> dict:
+    items = []
+    for task in sorted(tasks, key=lambda task: (task.scheduled_for, task.priority != "high")):
+        asset = equipment.get(task.equipment_id)
+        items.append({
+            "task_id": str(task.id),
+            "equipment_id": str(task.equipment_id),
+            "asset_tag": asset.asset_tag if asset else None,
+            "location": asset.location if asset else None,
+            "scheduled_for": task.scheduled_for.isoformat(),
+            "type": task.type,
+            "priority": task.priority,
+        })
+    lines = [
+        f"- {item['scheduled_for']} {item['asset_tag'] or item['equipment_id']}"
+        f" ({item['location'] or 'sin ubicación'}): {item['type']}, prioridad {item['priority']}"
+        for item in items
+    ]
+    return {
+        "team": team,
+        "subject": f"Mantenimientos próximos: {len(items)} tarea(s) para {team}",
+        "body": "Tareas programadas en los próximos días:\n\n" + "\n".join(lines),
+        "tasks": items,
+    }
+
+
+def _queue_reminders(limit_date: date) -> tuple:
+    """Toma las tareas por recordar y deja un resumen pendiente por equipo y destino.
+
+    Marcar ``reminder_token`` y registrar las entregas ocurre en la misma
+    transacción: una tarea se recuerda una sola vez por fecha programada (al
+    reprogramarla el token se limpia) y un fallo posterior no pierde el aviso.
+    """
+    task = models.MaintenanceTask
+    token = uuid.uuid4().hex
     with session_scope() as session:
-        upcoming_date = date.today() + timedelta(days=REMINDER_DAYS)
-        tasks = (
-            session.query(models.MaintenanceTask)
-            .filter(
-                models.MaintenanceTask.scheduled_for <= upcoming_date,
-                models.MaintenanceTask.status == "scheduled",
-            )
-            .all()
+        due = (
+            select(task.id)
+            .where(task.status == "scheduled", task.reminder_token.is_(None), task.scheduled_for <= limit_date)
+            .order_by(task.scheduled_for)
+            .limit(REMINDER_BATCH_SIZE)
+            .with_for_update(skip_locked=True)
         )
-        for task in tasks:
-            logger.info(
-                "Recordatorio: tarea %s para equipo %s programada el %s",
-                task.id,
-                task.equipment_id,
-                task.scheduled_for,
+        tasks = session.execute(
+            update(task)
+            .where(task.id.in_(due))
+            .values(reminder_token=token)
+            .returning(task.id, task.equipment_id, task.scheduled_for, task.type, task.priority, task.assigned_team)
+        ).all()
+        if not tasks:
+            return 0, 0
+        equipment = {
+            row.id: row
+            for row in session.execute(
+                select(models.Equipment.id, models.Equipment.asset_tag, models.Equipment.location)
+                .where(models.Equipment.id.in_({item.equipment_id for item in tasks}))
             )
+        }
+        by_team = defaultdict(list)
+        for item in tasks:
+            by_team[item.assigned_team or UNASSIGNED_TEAM].append(item)
+        session.execute(insert(models.ReminderDelivery), [
+            {
+                "batch_token": token,
+                "team": team,
+                "sink": sink,
+                "task_count": len(items),
+                "payload": json.dumps(_digest(team, items, equipment), ensure_ascii=False),
+            }
+            for team, items in by_team.items()
+            for sink in reminder_sinks()
+        ])
+    return len(tasks), len(by_team)
 
 
-def mark_obsolete_equipment():
+def _claim_deliveries(sinks: Dict[str, object]) -> list:
+    """Reserva las entregas por enviar (nuevas, fallidas o con reserva vencida).
+
+    Pasan a ``sending`` en una sola sentencia con ``SKIP LOCKED``: dos
+    ejecuciones simultáneas (la API y el worker, o un reintento tras vencer el
+    arrendamiento del trabajo) nunca toman la misma entrega. Si el proceso
+    muere a mitad del envío, la reserva vence tras ``REMINDER_SEND_LEASE``.
+    """
+    delivery = models.ReminderDelivery
+    now = datetime.utcnow()
+    claimable = (
+        select(delivery.id)
+        .where(
+            delivery.attempts < REMINDER_MAX_ATTEMPTS,
+            delivery.sink.in_(sinks),
+            or_(
+                delivery.status.in_(("pending", "failed")),
+                and_(delivery.status == "sending", delivery.claimed_until < now),
+            ),
+        )
+        .order_by(delivery.created_at)
+        .with_for_update(skip_locked=True)
+    )
     with session_scope() as session:
-        cutoff_year = date.today().year - OBSOLETE_YEARS
-        equipment = (
-            session.query(models.Equipment)
-            .filter(models.Equipment.purchase_date != None)  # noqa: E711
-            .all()
+        return session.execute(
+            update(delivery)
+            .where(delivery.id.in_(claimable))
+            .values(
+                status="sending",
+                attempts=delivery.attempts + 1,
+                claimed_until=now + timedelta(seconds=REMINDER_SEND_LEASE),
+            )
+            .returning(delivery.id, delivery.sink, delivery.payload)
+        ).all()
+
+
+def _deliver_pending() -> tuple:
+    """Envía las entregas no enviadas (nuevas o fallidas) con concurrencia acotada."""
+    sinks = reminder_sinks()
+    pending = _claim_deliveries(sinks)
+
+    def send(row) -> str | None:
+        try:
+            sinks[row.sink].send(json.loads(row.payload))
+        except Exception as exc:
+            logger.warning("Entrega %s por %s falló: %s", row.id, row.sink, exc)
+            return f"{type(exc).__name__}: {exc}"
+        return None
+
+    table = models.ReminderDelivery.__table__
+    record = (
+        update(table)
+        .where(table.c.id == bindparam("delivery_id"))
+        .values(
+            status=bindparam("new_status"),
+            error=bindparam("message"),
+            claimed_until=None,
+            sent_at=bindparam("delivered_at"),
         )
-        for item in equipment:
-            if item.purchase_date.year <= cutoff_year and item.status == "operational":
-                item.status = "obsolete"
-                session.add(item)
-                logger.warning(
-                    "Equipo %s marcado como obsoleto (compra %s)",
-                    item.asset_tag,
-                    item.purchase_date,
+    )
+    sent = failed = 0
+    with ThreadPoolExecutor(max_workers=REMINDER_CONCURRENCY) as pool:
+        futures = {pool.submit(send, row): row for row in pending}
+        for future in as_completed(futures):
+            error = future.result()
+            # Se registra cada resultado al llegar: si el proceso muere, sólo
+            # se reenvía lo que no consta como enviado.
+            with session_scope() as session:
+                session.execute(record, {
+                    "delivery_id": futures[future].id,
+                    "new_status": "failed" if error else "sent",
+                    "message": error,
+                    "delivered_at": None if error else datetime.utcnow(),
+                })
+            if error:
+                failed += 1
+            else:
+                sent += 1
+    return sent, failed
+
+
+def send_reminders() -> dict:
+    started = time.perf_counter()
+    tasks, digests = _queue_reminders(date.today() + timedelta(days=REMINDER_DAYS))
+    sent, failed = _deliver_pending()
+    summary = {
+        "tasks": tasks,
+        "digests": digests,
+        "sent": sent,
+        "failed": failed,
+        "elapsed_seconds": round(time.perf_counter() - started, 3),
+    }
+    logger.info(
+        "Recordatorios: %s tareas en %s resúmenes; %s entregas enviadas, %s fallidas",
+        tasks, digests, sent, failed,
+    )
+    return summary
+
+
+def remind_maintenance():
+    return send_reminders()["tasks"]
+
+
+def obsolescence_cutoff(today: date | None = None) -> date:
+    """Último día de compra que vuelve obsoleto a un equipo: fin del año ``hoy - OBSOLETE_YEARS``."""
+    today = today or date.today()
+    return date(today.year - OBSOLETE_YEARS, 12, 31)
+
+
+def _obsolescence_filter(cutoff: date) -> tuple:
+    return (
+        models.Equipment.status == "operational",
+        models.Equipment.purchase_date <= cutoff,
+    )
+
+
+def run_obsolescence(cutoff: date | None = None, chunk_size: int = OBSOLESCENCE_CHUNK_SIZE) -> dict:
+    """Marca como obsoletos los equipos operativos comprados hasta ``cutoff``.
+
+    Trabaja por bloques de ``chunk_size`` equipos, cada uno en una transacción
+    corta: un ``UPDATE ... RETURNING`` y el ``INSERT`` de su auditoría en
+    ``equipment_status_audit``. Las filas bloqueadas por otra transacción se
+    saltan y quedan para la siguiente ejecución.
+    """
+    cutoff = cutoff or obsolescence_cutoff()
+    conditions = _obsolescence_filter(cutoff)
+    run_id = uuid.uuid4()
+    updated = chunks = 0
+    started = time.perf_counter()
+    while True:
+        with session_scope() as session:
+            batch = (
+                select(models.Equipment.id)
+                .where(*conditions)
+                .limit(chunk_size)
+                .with_for_update(skip_locked=True)
+            )
+            changed = session.execute(
+                update(models.Equipment)
+                .where(models.Equipment.id.in_(batch), *conditions)
+                .values(status="obsolete")
+                .returning(models.Equipment.id, models.Equipment.asset_tag, models.Equipment.purchase_date)
+            ).all()
+            if changed:
+                session.execute(
+                    insert(models.EquipmentStatusAudit),
+                    [
+                        {
+                            "run_id": run_id,
+                            "equipment_id": row.id,
+                            "asset_tag": row.asset_tag,
+                            "purchase_date": row.purchase_date,
+                            "from_status": "operational",
+                            "to_status": "obsolete",
+                            "reason": f"Compra anterior o igual a {cutoff.isoformat()}",
+                        }
+                        for row in changed
+                    ],
                 )
+        updated += len(changed)
+        chunks += 1
+        if len(changed) < chunk_size:
+            break
+    elapsed = time.perf_counter() - started
+    return {
+        "run_id": run_id,
+        "cutoff": cutoff,
+        "updated": updated,
+        "chunks": chunks,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_second": round(updated / elapsed, 1) if elapsed else 0.0,
+    }
+
+
+def mark_obsolete_equipment():
+    report = run_obsolescence()
+    logger.warning(
+        "Obsolescencia %s: %s equipos marcados (compra <= %s) en %s s, %s filas/s",
+        report["run_id"],
+        report["updated"],
+        report["cutoff"],
+        report["elapsed_seconds"],
+        report["rows_per_second"],
+    )
+    return report["updated"]
+
+
+JOBS = [
+    jobs.Job("reminders", remind_maintenance, jobs.every(hours=12), lease_seconds=900),
+    jobs.Job("obsolescence", mark_obsolete_equipment, jobs.daily_at(hour=3), lease_seconds=3600),
+]
 
 
 def start_scheduler():
     if scheduler.running:
         return
-    scheduler.add_job(remind_maintenance, "interval", hours=12, id="reminders")
-    scheduler.add_job(mark_obsolete_equipment, "cron", hour=3, id="obsolescence")
+    # Todas las réplicas revisan los horarios; job_runs decide cuál ejecuta cada uno.
+    jobs.schedule_checks(scheduler, JOBS, JOB_CHECK_INTERVAL)
     scheduler.start()
 
 
@@ -77,28 +334,43 @@ app = FastAPI(
 
 @app.on_event("startup")
 def on_startup():
-    start_scheduler()
+    if RUN_SCHEDULER:
+        start_scheduler()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    if scheduler.running:
+        scheduler.shutdown(wait=False)
 
 
 @app.post("/tasks", response_model=schemas.MaintenanceTaskOut, status_code=201)
 def create_task(
     payload: schemas.MaintenanceTaskCreate, db: Session = Depends(get_session)
 ):
-    equipment = db.get(models.Equipment, payload.equipment_id)
-    if not equipment:
+    statement = insert(models.MaintenanceTask).values(**payload.dict()).returning(models.MaintenanceTask)
+    try:
+        task = db.scalars(statement).one()
+    except IntegrityError:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Equipo no encontrado")
-    task = models.MaintenanceTask(**payload.dict())
-    db.add(task)
+    created = schemas.MaintenanceTaskOut.from_orm(task)
     db.commit()
-    db.refresh(task)
-    return task
+    return created
 
 
 @app.get("/tasks/upcoming", response_model=List[schemas.MaintenanceTaskOut])
-def upcoming_tasks(db: Session = Depends(get_session)):
+def upcoming_tasks(
+    request: Request, response: Response, db: Session = Depends(get_read_session)
+):
     limit_date = date.today() + timedelta(days=REMINDER_DAYS)
+    etag = utils.table_etag(db, models.MaintenanceTask, "equipment_labels", extra=limit_date.isoformat())
+    if utils.etag_matches(request, etag):
+        return utils.not_modified(etag)
+    response.headers["ETag"] = etag
     tasks = (
         db.query(models.MaintenanceTask)
+        .options(joinedload(models.MaintenanceTask.equipment))
         .filter(models.MaintenanceTask.scheduled_for <= limit_date)
         .order_by(models.MaintenanceTask.scheduled_for)
         .all()
@@ -106,46 +378,206 @@ def upcoming_tasks(db: Session = Depends(get_session)):
     return tasks
 
 
-@app.get("/tasks", response_model=List[schemas.MaintenanceTaskOut])
-def list_tasks(db: Session = Depends(get_session)):
-    return (
-        db.query(models.MaintenanceTask)
-        .order_by(models.MaintenanceTask.scheduled_for.desc())
-        .all()
+@app.get("/tasks", response_model=schemas.MaintenanceTaskPage)
+def list_tasks(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_session),
+    status: str | None = None,
+    priority: str | None = None,
+    type: str | None = None,
+    team: str | None = None,
+    equipment_id: UUID | None = None,
+    since: date | None = None,
+    until: date | None = None,
+    order: Literal["asc", "desc"] = "desc",
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Tareas por ``scheduled_for`` (``since``/``until`` inclusivos), paginadas por cursor.
+
+    Los filtros deben repetirse junto con el cursor, como en ``/equipment``.
+    """
+    # Las tareas muestran asset_tag y name del equipo; otros cambios no las afectan
+    etag = utils.table_etag(db, models.MaintenanceTask, "equipment_labels")
+    if utils.etag_matches(request, etag):
+        return utils.not_modified(etag)
+    response.headers["ETag"] = etag
+    position = utils.decode_cursor(cursor) if cursor else None
+    order = utils.cursor_option(position, "order", order, ("asc", "desc"))
+    task = models.MaintenanceTask
+    query = db.query(task)
+    for column, value in (
+        (task.status, status),
+        (task.priority, priority),
+        (task.type, type),
+        (task.assigned_team, team),
+        (task.equipment_id, equipment_id),
+    ):
+        if value:
+            query = query.filter(column == value)
+    if since:
+        query = query.filter(task.scheduled_for >= since)
+    if until:
+        query = query.filter(task.scheduled_for <= until)
+    page = utils.keyset_page(
+        query.options(joinedload(task.equipment)),
+        [task.scheduled_for, task.id],
+        limit,
+        position,
+        descending=order == "desc",
+        order=order,
     )
+    page["total_estimate"] = utils.estimate_count(db, query)
+    return page
 
 
 @app.patch("/tasks/{task_id}", response_model=schemas.MaintenanceTaskOut)
 def update_task(
     task_id: UUID, payload: schemas.MaintenanceTaskUpdate, db: Session = Depends(get_session)
 ):
-    task = db.get(models.MaintenanceTask, task_id)
-    if not task:
+    changes = payload.dict(exclude_unset=True)
+    if "scheduled_for" in changes:
+        # Nueva fecha: la tarea vuelve a ser candidata a recordatorio
+        changes["reminder_token"] = None
+    statement = (
+        update(models.MaintenanceTask)
+        .where(models.MaintenanceTask.id == task_id)
+        .values(**changes)
+        .returning(models.MaintenanceTask)
+    )
+    task = db.scalars(statement).one_or_none()
+    if task is None:
         raise HTTPException(status_code=404, detail="Tarea no encontrada")
-    for key, value in payload.dict(exclude_unset=True).items():
-        setattr(task, key, value)
+    updated = schemas.MaintenanceTaskOut.from_orm(task)
     db.commit()
-    db.refresh(task)
-    return task
+    return updated
 
 
 @app.post("/logs", response_model=schemas.MaintenanceLogOut, status_code=201)
 def create_log(
     payload: schemas.MaintenanceLogBase, db: Session = Depends(get_session)
 ):
-    task = db.get(models.MaintenanceTask, payload.task_id)
-    if not task:
+    completed = db.execute(
+        update(models.MaintenanceTask)
+        .where(models.MaintenanceTask.id == payload.task_id)
+        .values(status="completed")
+        .returning(models.MaintenanceTask.id)
+    ).first()
+    if completed is None:
         raise HTTPException(status_code=404, detail="Tarea no encontrada")
-    task.status = "completed"
-    log = models.MaintenanceLog(**payload.dict())
-    db.add(log)
-    db.add(task)
+    log = db.scalars(insert(models.MaintenanceLog).values(**payload.dict()).returning(models.MaintenanceLog)).one()
+    created = schemas.MaintenanceLogOut.from_orm(log)
     db.commit()
-    db.refresh(log)
-    return log
+    return created
+
+
+@app.get("/logs", response_model=schemas.MaintenanceLogPage)
+def list_logs(
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_session),
+    task_id: UUID | None = None,
+    equipment_id: UUID | None = None,
+    since: date | None = None,
+    until: date | None = None,
+    order: Literal["asc", "desc"] = "desc",
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+):
+    """Bitácoras por fecha de registro; ``since``/``until`` filtran por ``completed_on``."""
+    etag = utils.table_etag(db, models.MaintenanceLog)
+    if utils.etag_matches(request, etag):
+        return utils.not_modified(etag)
+    response.headers["ETag"] = etag
+    position = utils.decode_cursor(cursor) if cursor else None
+    order = utils.cursor_option(position, "order", order, ("asc", "desc"))
+    log = models.MaintenanceLog
+    query = db.query(log)
+    if task_id:
+        query = query.filter(log.task_id == task_id)
+    if equipment_id:
+        query = query.join(models.MaintenanceTask, models.MaintenanceTask.id == log.task_id).filter(
+            models.MaintenanceTask.equipment_id == equipment_id
+        )
+    if since:
+        query = query.filter(log.completed_on >= since)
+    if until:
+        query = query.filter(log.completed_on <= until)
+    page = utils.keyset_page(query, [log.created_at, log.id], limit, position, descending=order == "desc", order=order)
+    page["total_estimate"] = utils.estimate_count(db, query)
+    return page
 
 
-@app.get("/logs", response_model=List[schemas.MaintenanceLogOut])
-def list_logs(db: Session = Depends(get_session)):
-    return db.query(models.MaintenanceLog).order_by(models.MaintenanceLog.created_at.desc()).all()
+def _check_cutoff(cutoff: date | None) -> date:
+    if cutoff and cutoff > date.today():
+        raise HTTPException(status_code=400, detail="La fecha de corte no puede ser futura")
+    return cutoff or obsolescence_cutoff()
 
+
+@app.get("/obsolescence/preview", response_model=schemas.ObsolescencePreview)
+def preview_obsolescence(
+    cutoff: date | None = None,
+    limit: int = Query(50, ge=0, le=500),
+    db: Session = Depends(get_read_session),
+):
+    """Equipos que marcaría el trabajo de obsolescencia, sin modificar nada."""
+    cutoff = _check_cutoff(cutoff)
+    conditions = _obsolescence_filter(cutoff)
+    candidates = db.scalar(select(func.count()).select_from(models.Equipment).where(*conditions))
+    sample = (
+        db.query(models.Equipment)
+        .filter(*conditions)
+        .order_by(models.Equipment.purchase_date, models.Equipment.asset_tag)
+        .limit(limit)
+        .all()
+    )
+    return {"cutoff": cutoff, "candidates": candidates, "sample": sample}
+
+
+@app.post("/obsolescence/run", response_model=schemas.ObsolescenceReport)
+def run_obsolescence_now(cutoff: date | None = None):
+    report = run_obsolescence(_check_cutoff(cutoff))
+    logger.warning("Obsolescencia %s ejecutada a pedido: %s equipos", report["run_id"], report["updated"])
+    return report
+
+
+@app.get("/obsolescence/audit", response_model=List[schemas.EquipmentStatusAuditOut])
+def obsolescence_audit(
+    run_id: UUID | None = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_session),
+):
+    query = db.query(models.EquipmentStatusAudit)
+    if run_id:
+        query = query.filter(models.EquipmentStatusAudit.run_id == run_id)
+    return query.order_by(models.EquipmentStatusAudit.changed_at.desc()).limit(limit).all()
+
+
+@app.get("/jobs/runs", response_model=List[schemas.JobRunOut])
+def list_job_runs(
+    job_id: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_read_session),
+):
+    query = db.query(models.JobRun)
+    if job_id:
+        query = query.filter(models.JobRun.job_id == job_id)
+    return query.order_by(models.JobRun.scheduled_for.desc()).limit(limit).all()
+
+
+@app.post("/reminders/run", response_model=schemas.ReminderRunSummary)
+def run_reminders_now():
+    return send_reminders()
+
+
+@app.get("/reminders/deliveries", response_model=List[schemas.ReminderDeliveryOut])
+def list_reminder_deliveries(
+    status: str | None = Query(None, pattern="^(pending|sending|sent|failed)$"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_read_session),
+):
+    query = db.query(models.ReminderDelivery)
+    if status:
+        query = query.filter(models.ReminderDelivery.status == status)
+    return query.order_by(models.ReminderDelivery.created_at.desc()).limit(limit).all()
@@ -0,0 +1,54 @@
+"""Worker de los trabajos programados del servicio de mantenimiento.
+
+Ejecuta los trabajos de ``app.main.JOBS`` en un proceso aparte de la API, con
+su propio pool de conexiones (``DATABASE_POOL_SIZE``/``DATABASE_MAX_OVERFLOW``)
+y a lo sumo ``WORKER_CONCURRENCY`` trabajos a la vez. Para que la API no los
+ejecute también, se arranca con ``RUN_SCHEDULER=false``. Pueden correr varios
+workers: ``job_runs`` garantiza que cada horario se ejecute una sola vez.
+
+Uso (desde ``services/maintenance_service``):
+    python -m app.worker          # revisa los horarios indefinidamente
+    python -m app.worker --once   # una sola revisión, p. ej. desde cron
+"""
+
+import argparse
+import logging
+import os
+
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.schedulers.blocking import BlockingScheduler
+
+from common import jobs
+
+from app.main import JOB_CHECK_INTERVAL, JOBS
+
+
+logger = logging.getLogger("maintenance-worker")
+
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "2"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Worker de trabajos programados de mantenimiento")
+    parser.add_argument("--once", action="store_true", help="revisa los horarios una vez y termina")
+    args = parser.parse_args()
+
+    if args.once:
+        for run in jobs.run_due(JOBS):
+            logger.info("%s (%s): %s", run["job_id"], run["scheduled_for"], run["status"])
+        return
+
+    scheduler = BlockingScheduler(
+        timezone="UTC",
+        executors={"default": ThreadPoolExecutor(WORKER_CONCURRENCY)},
+    )
+    jobs.schedule_checks(scheduler, JOBS, JOB_CHECK_INTERVAL)
+    logger.info("Worker %s: %s trabajos, revisión cada %s s", jobs.INSTANCE_ID, len(JOBS), JOB_CHECK_INTERVAL)
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+
+
+if __name__ == "__main__":
+    main()
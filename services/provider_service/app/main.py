@@ -1,11 +1,13 @@
 from typing import List
 from uuid import UUID
 
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from common import models, schemas
-from common.database import get_session
+from common import models, schemas, utils
+from common.database import get_read_session, get_session
 
 
 app = FastAPI(
@@ -17,15 +19,20 @@ app = FastAPI(
 
 @app.post("/suppliers", response_model=schemas.SupplierOut, status_code=201)
 def create_supplier(payload: schemas.SupplierCreate, db: Session = Depends(get_session)):
-    supplier = models.Supplier(**payload.dict())
-    db.add(supplier)
+    supplier = db.scalars(insert(models.Supplier).values(**payload.dict()).returning(models.Supplier)).one()
+    created = schemas.SupplierOut.from_orm(supplier)
     db.commit()
-    db.refresh(supplier)
-    return supplier
+    return created
 
 
 @app.get("/suppliers", response_model=List[schemas.SupplierOut])
-def list_suppliers(db: Session = Depends(get_session)):
+def list_suppliers(
+    request: Request, response: Response, db: Session = Depends(get_read_session)
+):
+    etag = utils.table_etag(db, models.Supplier)
+    if utils.etag_matches(request, etag):
+        return utils.not_modified(etag)
+    response.headers["ETag"] = etag
     return db.query(models.Supplier).order_by(models.Supplier.created_at.desc()).all()
 
 
@@ -35,14 +42,18 @@ def update_supplier(
     payload: schemas.SupplierUpdate,
     db: Session = Depends(get_session),
 ):
-    supplier = db.get(models.Supplier, supplier_id)
-    if not supplier:
+    statement = (
+        update(models.Supplier)
+        .where(models.Supplier.id == supplier_id)
+        .values(**payload.dict(exclude_unset=True))
+        .returning(models.Supplier)
+    )
+    supplier = db.scalars(statement).one_or_none()
+    if supplier is None:
         raise HTTPException(status_code=404, detail="Proveedor no encontrado")
-    for key, value in payload.dict(exclude_unset=True).items():
-        setattr(supplier, key, value)
+    updated = schemas.SupplierOut.from_orm(supplier)
     db.commit()
-    db.refresh(supplier)
-    return supplier
+    return updated
 
 
 @app.post(
@@ -55,24 +66,38 @@ def add_contract(
     payload: schemas.SupplierContractBase,
     db: Session = Depends(get_session),
 ):
-    supplier = db.get(models.Supplier, supplier_id)
-    if not supplier:
+    statement = (
+        insert(models.SupplierContract)
+        .values(**payload.dict(), supplier_id=supplier_id)
+        .returning(models.SupplierContract)
+    )
+    try:
+        contract = db.scalars(statement).one()
+    except IntegrityError:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Proveedor no encontrado")
-    contract = models.SupplierContract(**payload.dict(), supplier_id=supplier_id)
-    db.add(contract)
+    created = schemas.SupplierContractOut.from_orm(contract)
     db.commit()
-    db.refresh(contract)
-    return contract
+    return created
 
 
 @app.get(
     "/suppliers/{supplier_id}/contracts",
     response_model=List[schemas.SupplierContractOut],
 )
-def list_contracts(supplier_id: UUID, db: Session = Depends(get_session)):
+def list_contracts(
+    supplier_id: UUID,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_session),
+):
     supplier = db.get(models.Supplier, supplier_id)
     if not supplier:
         raise HTTPException(status_code=404, detail="Proveedor no encontrado")
+    etag = utils.table_etag(db, models.SupplierContract)
+    if utils.etag_matches(request, etag):
+        return utils.not_modified(etag)
+    response.headers["ETag"] = etag
     return supplier.contracts
 
 
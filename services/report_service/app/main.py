@@ -3,15 +3,15 @@ from datetime import datetime
 from typing import Dict
 
 import pandas as pd
-from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
 from fastapi.responses import StreamingResponse
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from sqlalchemy.orm import Session
 
-from common import models
-from common.database import get_session
+from common import models, utils
+from common.database import get_read_session
 
 
 app = FastAPI(
@@ -63,14 +63,21 @@ def _aggregate_metrics(db: Session) -> Dict:
 
 
 @app.get("/reports/dashboard")
-def dashboard(db: Session = Depends(get_session)):
+def dashboard(request: Request, response: Response, db: Session = Depends(get_read_session)):
+    # El perfil de antigüedad depende del año en curso.
+    etag = utils.table_etag(
+        db, models.Equipment, models.MaintenanceLog, extra=str(datetime.now().year)
+    )
+    if utils.etag_matches(request, etag):
+        return utils.not_modified(etag)
+    response.headers["ETag"] = etag
     return _aggregate_metrics(db)
 
 
 @app.get("/reports/export")
 def export_report(
     format: str = Query("excel", pattern="^(excel|pdf)$"),
-    db: Session = Depends(get_session),
+    db: Session = Depends(get_read_session),
 ):
     metrics = _aggregate_metrics(db)
     if format == "excel":
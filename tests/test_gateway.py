@@ -0,0 +1,67 @@
+"""Comprobaciones del gateway que no necesitan los microservicios."""
+
+import importlib.util
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture(scope="module")
+def gateway():
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("SESSION_SECRET", "test-session-secret")
+        # Sólo se usa para autenticación; ninguna de estas pruebas la consulta
+        patch.setenv("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/gateway-tests.db")
+        path = ROOT / "api_gateway" / "app" / "main.py"
+        spec = importlib.util.spec_from_file_location("api_gateway.app.main", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def client(gateway):
+    from fastapi.testclient import TestClient
+
+    token, _ = gateway.issue_token(SimpleNamespace(id="tests", username="tests", role="admin"))
+    return TestClient(gateway.app, headers={"Authorization": f"Bearer {token}"})
+
+
+@pytest.mark.parametrize(
+    "path",
+    ["/batch", "/batch/", "/batch?x=1", "/./batch", "/%2e/batch", "/%62atch", "/health/../batch", "//batch"],
+)
+def test_batch_refuses_nested_batches(client, path):
+    response = client.post("/batch", json={"requests": [{"method": "POST", "path": path}, {"path": "/health"}]})
+
+    assert response.status_code == 200
+    nested, health = response.json()["responses"]
+    assert nested == {"status": 400, "body": {"detail": "Ruta no permitida en un lote"}}
+    assert health["status"] == 200
+
+
+@pytest.mark.parametrize("signature", ["é", "firma-ñ", "☃" * 43])
+def test_non_ascii_signature_is_unauthorized(gateway, client, signature):
+    token, _ = gateway.issue_token(SimpleNamespace(id="tests", username="tests", role="admin"))
+    forged = token.rsplit(".", 1)[0] + "." + signature
+
+    # httpx sólo acepta cabeceras no ASCII ya codificadas
+    response = client.get("/cache/stats", headers={"Authorization": f"Bearer {forged}".encode()})
+
+    assert response.status_code == 401
+
+
+def test_reads_after_a_write_go_to_the_primary(gateway, monkeypatch):
+    monkeypatch.setattr(gateway, "response_cache", gateway.ResponseCache(ttl=30, max_bytes=1024))
+
+    assert gateway._read_kwargs("maintenance", {"params": {"limit": 5}}) == {"params": {"limit": 5}}
+    gateway.response_cache.invalidate("maintenance")
+    after_write = gateway._read_kwargs("maintenance", {"headers": {"If-None-Match": "x"}})
+
+    assert after_write["headers"] == {"If-None-Match": "x", gateway.READ_PRIMARY_HEADER: "1"}
+    assert gateway._read_kwargs("equipment", {}) == {}
@@ -0,0 +1,224 @@
+"""Recordatorios de mantenimiento: deduplicación, resúmenes, reintentos y entrega SMTP.
+
+Las pruebas del pipeline necesitan PostgreSQL en ``TEST_DATABASE_URL`` (ver
+``test_equipment_create.py``) y vacían las tareas y entregas de esa base. La
+de SMTP usa un servidor local mínimo y no necesita base de datos.
+"""
+
+import email.policy
+import importlib.util
+import os
+import socketserver
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+
+ROOT = Path(__file__).resolve().parents[1]
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+requires_postgres = pytest.mark.skipif(
+    not (TEST_DATABASE_URL or "").startswith("postgresql"),
+    reason="TEST_DATABASE_URL no apunta a PostgreSQL",
+)
+
+
+class RecordingSink:
+    """Guarda cada mensaje; con ``failures`` falla ese número de envíos primero."""
+
+    def __init__(self, name: str, failures: int = 0, delay: float = 0):
+        self.name = name
+        self.failures = failures
+        self.delay = delay
+        self.messages = []
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        time.sleep(self.delay)
+        with self._lock:
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError(f"{self.name} no disponible")
+            self.messages.append(message)
+
+    def task_ids(self):
+        return Counter(item["task_id"] for message in self.messages for item in message["tasks"])
+
+
+@pytest.fixture(scope="module")
+def maintenance():
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+    sys.path.insert(0, str(ROOT))
+    path = ROOT / "services" / "maintenance_service" / "app" / "main.py"
+    spec = importlib.util.spec_from_file_location("maintenance_service.app.main", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def schedule(maintenance):
+    """Vacía tareas y entregas y devuelve una función que programa tareas."""
+    from sqlalchemy import text
+
+    from common import models
+    from common.database import session_scope
+
+    with session_scope() as session:
+        session.execute(text("TRUNCATE reminder_deliveries, maintenance_tasks CASCADE"))
+        equipment = models.Equipment(asset_tag=f"REM-{uuid.uuid4().hex[:10]}", location="Lab 1")
+        session.add(equipment)
+        session.flush()
+        equipment_id = equipment.id
+
+    def add(team, days=1, status="scheduled"):
+        with session_scope() as session:
+            task = models.MaintenanceTask(
+                equipment_id=equipment_id,
+                scheduled_for=date.today() + timedelta(days=days),
+                type="preventive",
+                priority="medium",
+                status=status,
+                assigned_team=team,
+            )
+            session.add(task)
+            session.flush()
+            return str(task.id)
+
+    return add
+
+
+def use_sinks(monkeypatch, maintenance, *sinks):
+    monkeypatch.setattr(maintenance, "reminder_sinks", lambda: {sink.name: sink for sink in sinks})
+
+
+@requires_postgres
+def test_each_task_is_reminded_once_in_a_digest_per_team(maintenance, schedule, monkeypatch):
+    sink = RecordingSink("recording")
+    use_sinks(monkeypatch, maintenance, sink)
+    due = {schedule("redes"), schedule("redes", days=3), schedule(None)}
+    schedule("redes", days=maintenance.REMINDER_DAYS + 5)
+    schedule("redes", status="completed")
+
+    first = maintenance.send_reminders()
+    second = maintenance.send_reminders()
+
+    assert (first["tasks"], first["digests"], first["sent"], first["failed"]) == (3, 2, 2, 0)
+    assert (second["tasks"], second["sent"]) == (0, 0)
+    assert sorted(message["team"] for message in sink.messages) == ["redes", maintenance.UNASSIGNED_TEAM]
+    assert sink.task_ids() == Counter(due)
+
+
+@requires_postgres
+def test_only_failed_deliveries_are_retried(maintenance, schedule, monkeypatch):
+    from common import models
+    from common.database import session_scope
+
+    healthy, flaky = RecordingSink("recording"), RecordingSink("flaky", failures=1)
+    use_sinks(monkeypatch, maintenance, healthy, flaky)
+    schedule("soporte")
+
+    first = maintenance.send_reminders()
+    retry = maintenance.send_reminders()
+
+    assert (first["sent"], first["failed"]) == (1, 1)
+    assert (retry["tasks"], retry["sent"], retry["failed"]) == (0, 1, 0)
+    assert len(healthy.messages) == len(flaky.messages) == 1
+    delivery = models.ReminderDelivery
+    with session_scope() as session:
+        rows = {
+            row.sink: row[1:]
+            for row in session.query(delivery.sink, delivery.status, delivery.attempts, delivery.claimed_until)
+        }
+    assert rows == {"recording": ("sent", 1, None), "flaky": ("sent", 2, None)}
+
+
+@requires_postgres
+def test_concurrent_runs_do_not_send_twice(maintenance, schedule, monkeypatch):
+    from common import models
+    from common.database import session_scope
+
+    sink = RecordingSink("recording", delay=0.01)
+    use_sinks(monkeypatch, maintenance, sink)
+    due = {schedule(f"equipo-{index % 5}", days=index % 4) for index in range(30)}
+    # Resúmenes ya pendientes, como tras un envío interrumpido: las ejecuciones
+    # compiten por entregarlos
+    maintenance._queue_reminders(date.today() + timedelta(days=maintenance.REMINDER_DAYS))
+    runs = 4
+    barrier = threading.Barrier(runs)
+    summaries = []
+
+    def run():
+        barrier.wait()
+        summaries.append(maintenance.send_reminders())
+
+    threads = [threading.Thread(target=run) for _ in range(runs)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with session_scope() as session:
+        deliveries = session.query(models.ReminderDelivery).count()
+    assert sink.task_ids() == Counter(due)
+    assert len(sink.messages) == deliveries == sum(summary["sent"] for summary in summaries)
+
+
+class SmtpStandIn(socketserver.StreamRequestHandler):
+    """Servidor SMTP mínimo: acepta todo y guarda el contenido de cada DATA."""
+
+    def handle(self):
+        self.wfile.write(b"220 stand-in\r\n")
+        data = None
+        for raw in self.rfile:
+            line = raw.rstrip(b"\r\n")
+            if data is not None:
+                if line == b".":
+                    message = email.message_from_bytes(b"\r\n".join(data), policy=email.policy.default)
+                    self.server.messages.append(message)
+                    data = None
+                    self.wfile.write(b"250 OK\r\n")
+                else:
+                    data.append(line[1:] if line.startswith(b"..") else line)
+            elif line[:4].upper() == b"DATA":
+                data = []
+                self.wfile.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+            elif line[:4].upper() == b"QUIT":
+                self.wfile.write(b"221 Bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 OK\r\n")
+
+
+@pytest.fixture
+def smtp_server():
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SmtpStandIn)
+    server.daemon_threads = True
+    server.messages = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_smtp_sink_mails_the_team_digest(smtp_server, monkeypatch):
+    sys.path.insert(0, str(ROOT))
+    from common import notifications
+
+    monkeypatch.setattr(notifications, "TEAM_EMAILS", {"redes": ["redes@uni.edu", "jefe@uni.edu"]})
+    host, port = smtp_server.server_address
+    sink = notifications.SmtpSink(host=host, port=port, sender="mantenimiento@uni.edu")
+
+    sink.send({"team": "redes", "subject": "Mantenimientos próximos", "body": "- 2024-05-02 EQ-1"})
+
+    [message] = smtp_server.messages
+    assert message["To"] == "redes@uni.edu, jefe@uni.edu"
+    assert message["From"] == "mantenimiento@uni.edu"
+    assert message["Subject"] == "Mantenimientos próximos"
+    assert "EQ-1" in message.get_content()